@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Callable, Collection, Optional
 
 import aiosqlite
 
@@ -19,6 +24,126 @@ def _row_value(row: aiosqlite.Row, key: str, default: object = None) -> object:
     return row[key] if key in row.keys() else default
 
 
+# Long-lived connection per database for the server's event loop, opened at
+# startup. Jobs run on their own loop in worker threads and keep opening
+# short-lived connections, so they never share a handle across loops.
+_shared: dict[str, tuple[asyncio.AbstractEventLoop, aiosqlite.Connection, asyncio.Lock]] = {}
+
+
+async def _open(db_path: str) -> aiosqlite.Connection:
+    # uri=True only changes how "file:" strings are read (e.g. shared-cache
+    # in-memory databases); plain paths open exactly as before.
+    conn = await aiosqlite.connect(db_path, timeout=5.0, uri=True)
+    conn.row_factory = aiosqlite.Row
+    # WAL is set once in init_db; NORMAL skips the per-commit fsync it allows.
+    await conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _shared_entry(
+    db_path: str,
+) -> Optional[tuple[asyncio.AbstractEventLoop, aiosqlite.Connection, asyncio.Lock]]:
+    entry = _shared.get(db_path)
+    if entry is None:
+        return None
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    return entry if entry[0] is loop else None
+
+
+@asynccontextmanager
+async def _connect(db_path: str) -> AsyncIterator[aiosqlite.Connection]:
+    # Reads share the writers' lock so they never see an uncommitted write.
+    entry = _shared_entry(db_path)
+    if entry is not None:
+        _, conn, lock = entry
+        async with lock:
+            yield conn
+        return
+    conn = await _open(db_path)
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
+
+@asynccontextmanager
+async def _transaction(db_path: str) -> AsyncIterator[aiosqlite.Connection]:
+    # Writers on the shared connection take turns so one coroutine's commit
+    # can't flush another's half-finished statements.
+    entry = _shared_entry(db_path)
+    if entry is None:
+        conn = await _open(db_path)
+        try:
+            yield conn
+        finally:
+            await conn.close()
+        return
+    _, conn, lock = entry
+    async with lock:
+        try:
+            yield conn
+        except BaseException:
+            await conn.rollback()
+            raise
+        # A write that matched no rows still opened a transaction; never
+        # leave it holding the database lock.
+        if conn.in_transaction:
+            await conn.commit()
+
+
+async def open_shared_connection(db_path: str) -> None:
+    if db_path in _shared:
+        return
+    conn = await _open(db_path)
+    await conn.execute("PRAGMA temp_store=MEMORY")
+    await conn.execute("PRAGMA cache_size=-64000")
+    _shared[db_path] = (asyncio.get_running_loop(), conn, asyncio.Lock())
+
+
+async def close_shared_connection(db_path: str) -> None:
+    entry = _shared.pop(db_path, None)
+    if entry is not None:
+        await entry[1].close()
+
+
+# Called with the job id after every job write; jobs run on worker threads,
+# so listeners must be thread-safe.
+_change_listeners: list[Callable[[str], None]] = []
+
+
+def add_change_listener(listener: Callable[[str], None]) -> None:
+    if listener not in _change_listeners:
+        _change_listeners.append(listener)
+
+
+def remove_change_listener(listener: Callable[[str], None]) -> None:
+    if listener in _change_listeners:
+        _change_listeners.remove(listener)
+
+
+# Polled partials re-read the same job several times a second; rows are kept
+# briefly and dropped on any write to that job. Misses are never cached.
+# Job threads write through their own loops, so every access takes the lock.
+JOB_CACHE_TTL_SECONDS = 0.5
+JOB_CACHE_MAXSIZE = 256
+_job_cache: OrderedDict[tuple[str, str], tuple[float, "Job"]] = OrderedDict()
+_job_cache_lock = threading.Lock()
+_job_cache_generation = 0
+
+
+def _notify_change(job_id: str) -> None:
+    global _job_cache_generation
+    with _job_cache_lock:
+        _job_cache_generation += 1
+        for key in [key for key in _job_cache if key[1] == job_id]:
+            del _job_cache[key]
+    for listener in list(_change_listeners):
+        listener(job_id)
+
+
 @dataclass
 class Job:
     id: str
@@ -37,147 +162,79 @@ class Job:
     output_path: Optional[str]
 
 
-async def init_db(db_path: str) -> None:
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    async with aiosqlite.connect(db_path) as db:
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS jobs (
-              id TEXT PRIMARY KEY,
-              topic TEXT NOT NULL,
-                            model TEXT,
-                            job_type TEXT,
-                            parent_id TEXT,
-                            source_path TEXT,
-              status TEXT NOT NULL,
-              progress REAL NOT NULL,
-              stage TEXT NOT NULL,
-              error TEXT,
-              output_path TEXT,
-                            queue_position INTEGER,
-                            started_at TEXT,
-              created_at TEXT NOT NULL,
-              updated_at TEXT NOT NULL
-            )
-            """
-        )
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS job_events (
-              id INTEGER PRIMARY KEY AUTOINCREMENT,
-              job_id TEXT NOT NULL,
-              ts TEXT NOT NULL,
-              level TEXT NOT NULL,
-              message TEXT NOT NULL,
-              FOREIGN KEY(job_id) REFERENCES jobs(id)
-            )
-            """
-        )
-        await db.execute(
-            "CREATE INDEX IF NOT EXISTS idx_job_events_job_id ON job_events(job_id)"
-        )
-        await db.commit()
-    await _ensure_queue_position(db_path)
-    await _ensure_model_column(db_path)
-    await _ensure_started_at_column(db_path)
-    await _ensure_job_type_column(db_path)
-    await _ensure_parent_id_column(db_path)
-    await _ensure_source_path_column(db_path)
-    await _ensure_cache_table(db_path)
-
-
-async def _ensure_queue_position(db_path: str) -> None:
-    async with aiosqlite.connect(db_path) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute("PRAGMA table_info(jobs)") as cur:
-            columns = [row["name"] for row in await cur.fetchall()]
-
-        if "queue_position" not in columns:
-            await db.execute("ALTER TABLE jobs ADD COLUMN queue_position INTEGER")
-            await db.commit()
+_SCHEMA_SQL = """
+PRAGMA journal_mode=WAL;
+CREATE TABLE IF NOT EXISTS jobs (
+  id TEXT PRIMARY KEY,
+  topic TEXT NOT NULL,
+  model TEXT,
+  job_type TEXT,
+  parent_id TEXT,
+  source_path TEXT,
+  status TEXT NOT NULL,
+  progress REAL NOT NULL,
+  stage TEXT NOT NULL,
+  error TEXT,
+  output_path TEXT,
+  queue_position INTEGER,
+  started_at TEXT,
+  created_at TEXT NOT NULL,
+  updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_events (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  job_id TEXT NOT NULL,
+  ts TEXT NOT NULL,
+  level TEXT NOT NULL,
+  message TEXT NOT NULL,
+  FOREIGN KEY(job_id) REFERENCES jobs(id)
+);
+CREATE INDEX IF NOT EXISTS idx_job_events_job_id ON job_events(job_id);
+CREATE TABLE IF NOT EXISTS app_cache (
+  key TEXT PRIMARY KEY,
+  value TEXT NOT NULL,
+  updated_at TEXT NOT NULL
+);
+"""
+
+# Columns added after the jobs table first shipped; older databases get them
+# on startup.
+_ADDED_JOB_COLUMNS = (
+    ("queue_position", "INTEGER"),
+    ("model", "TEXT"),
+    ("started_at", "TEXT"),
+    ("job_type", "TEXT"),
+    ("parent_id", "TEXT"),
+    ("source_path", "TEXT"),
+)
+
+_QUEUE_POSITION_SQL = """
+WITH ordered AS (
+  SELECT id, row_number() OVER (ORDER BY created_at ASC) AS rn
+  FROM jobs
+  WHERE queue_position IS NULL
+)
+UPDATE jobs
+SET queue_position = (SELECT rn FROM ordered WHERE ordered.id = jobs.id)
+WHERE queue_position IS NULL;
+CREATE INDEX IF NOT EXISTS idx_jobs_queue_position ON jobs(queue_position);
+"""
 
-        await db.execute(
-            """
-            WITH ordered AS (
-              SELECT id, row_number() OVER (ORDER BY created_at ASC) AS rn
-              FROM jobs
-              WHERE queue_position IS NULL
-            )
-            UPDATE jobs
-            SET queue_position = (SELECT rn FROM ordered WHERE ordered.id = jobs.id)
-            WHERE queue_position IS NULL
-            """
-        )
-        await db.commit()
 
-        await db.execute(
-            "CREATE INDEX IF NOT EXISTS idx_jobs_queue_position ON jobs(queue_position)"
-        )
-        await db.commit()
-
-
-async def _ensure_model_column(db_path: str) -> None:
-    async with aiosqlite.connect(db_path) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute("PRAGMA table_info(jobs)") as cur:
-            columns = [row["name"] for row in await cur.fetchall()]
-        if "model" not in columns:
-            await db.execute("ALTER TABLE jobs ADD COLUMN model TEXT")
-            await db.commit()
-
-
-async def _ensure_job_type_column(db_path: str) -> None:
-    async with aiosqlite.connect(db_path) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute("PRAGMA table_info(jobs)") as cur:
-            columns = [row["name"] for row in await cur.fetchall()]
-        if "job_type" not in columns:
-            await db.execute("ALTER TABLE jobs ADD COLUMN job_type TEXT")
-            await db.commit()
-
-
-async def _ensure_parent_id_column(db_path: str) -> None:
-    async with aiosqlite.connect(db_path) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute("PRAGMA table_info(jobs)") as cur:
-            columns = [row["name"] for row in await cur.fetchall()]
-        if "parent_id" not in columns:
-            await db.execute("ALTER TABLE jobs ADD COLUMN parent_id TEXT")
-            await db.commit()
-
-
-async def _ensure_source_path_column(db_path: str) -> None:
-    async with aiosqlite.connect(db_path) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute("PRAGMA table_info(jobs)") as cur:
-            columns = [row["name"] for row in await cur.fetchall()]
-        if "source_path" not in columns:
-            await db.execute("ALTER TABLE jobs ADD COLUMN source_path TEXT")
-            await db.commit()
-
-
-async def _ensure_started_at_column(db_path: str) -> None:
-    async with aiosqlite.connect(db_path) as db:
-        db.row_factory = aiosqlite.Row
+async def init_db(db_path: str) -> None:
+    if not db_path.startswith("file:"):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    # One connection and two scripts instead of a connection per migration step.
+    async with _transaction(db_path) as db:
+        await db.executescript(_SCHEMA_SQL)
         async with db.execute("PRAGMA table_info(jobs)") as cur:
-            columns = [row["name"] for row in await cur.fetchall()]
-        if "started_at" not in columns:
-            await db.execute("ALTER TABLE jobs ADD COLUMN started_at TEXT")
-            await db.commit()
-
-
-async def _ensure_cache_table(db_path: str) -> None:
-    async with aiosqlite.connect(db_path) as db:
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS app_cache (
-              key TEXT PRIMARY KEY,
-              value TEXT NOT NULL,
-              updated_at TEXT NOT NULL
-            )
-            """
+            columns = {row["name"] for row in await cur.fetchall()}
+        migrations = "".join(
+            f"ALTER TABLE jobs ADD COLUMN {name} {decl};\n"
+            for name, decl in _ADDED_JOB_COLUMNS
+            if name not in columns
         )
-        await db.commit()
+        await db.executescript(migrations + _QUEUE_POSITION_SQL)
 
 
 async def create_job(
@@ -191,12 +248,6 @@ async def create_job(
 ) -> Job:
     job_id = str(uuid.uuid4())
     now = _utc_now_iso()
-    async with aiosqlite.connect(db_path) as db:
-        async with db.execute(
-            "SELECT COALESCE(MAX(queue_position), 0) FROM jobs"
-        ) as cur:
-            row = await cur.fetchone()
-            next_pos = int(row[0] or 0) + 1
     job = Job(
         id=job_id,
         topic=topic.strip(),
@@ -213,7 +264,9 @@ async def create_job(
         error=None,
         output_path=None,
     )
-    async with aiosqlite.connect(db_path) as db:
+    async with _transaction(db_path) as db:
+        # The position is computed inside the INSERT, so concurrent creates
+        # can't read the same MAX and collide.
         await db.execute(
             """
             INSERT INTO jobs (
@@ -221,7 +274,11 @@ async def create_job(
                 status, progress, stage, error, output_path, queue_position,
                 created_at, updated_at
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (
+                ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                (SELECT COALESCE(MAX(queue_position), 0) + 1 FROM jobs),
+                ?, ?
+            )
             """,
             (
                 job.id,
@@ -235,12 +292,12 @@ async def create_job(
                 job.stage,
                 job.error,
                 job.output_path,
-                next_pos,
                 job.created_at,
                 job.updated_at,
             ),
         )
         await db.commit()
+    _notify_change(job.id)
     return job
 
 
@@ -281,47 +338,144 @@ async def set_job_status(
     sql = f"UPDATE jobs SET {', '.join(fields)} WHERE id = ?"
     values.append(job_id)
 
-    async with aiosqlite.connect(db_path) as db:
+    async with _transaction(db_path) as db:
         await db.execute(sql, tuple(values))
         await db.commit()
+    _notify_change(job_id)
+
+
+async def update_job_status_if(
+    db_path: str,
+    job_id: str,
+    *,
+    from_statuses: Collection[str],
+    status: str,
+    stage: str,
+    progress: Optional[float] = None,
+    event: Optional[str] = None,
+) -> bool:
+    # The precondition is part of the UPDATE, so check and write are one
+    # statement; the event is logged in the same transaction.
+    now = _utc_now_iso()
+    fields = ["status = ?", "stage = ?", "updated_at = ?"]
+    values: list[Any] = [status, stage, now]
+    if progress is not None:
+        fields.append("progress = ?")
+        values.append(progress)
+    placeholders = ", ".join("?" for _ in from_statuses)
+    sql = (
+        f"UPDATE jobs SET {', '.join(fields)} "
+        f"WHERE id = ? AND status IN ({placeholders})"
+    )
+    values.append(job_id)
+    values.extend(from_statuses)
+
+    async with _transaction(db_path) as db:
+        cur = await db.execute(sql, tuple(values))
+        if cur.rowcount == 0:
+            return False
+        if event:
+            await db.execute(
+                "INSERT INTO job_events (job_id, ts, level, message) VALUES (?, ?, ?, ?)",
+                (job_id, now, "info", event),
+            )
+        await db.commit()
+    _notify_change(job_id)
+    return True
 
 
 async def append_event(db_path: str, job_id: str, level: str, message: str) -> None:
-    async with aiosqlite.connect(db_path) as db:
+    async with _transaction(db_path) as db:
         await db.execute(
             "INSERT INTO job_events (job_id, ts, level, message) VALUES (?, ?, ?, ?)",
             (job_id, _utc_now_iso(), level, message),
         )
         await db.commit()
+    _notify_change(job_id)
+
+
+def _job_from_row(row: aiosqlite.Row) -> Job:
+    return Job(
+        id=row["id"],
+        topic=row["topic"],
+        model=row["model"] or "",
+        job_type=_row_value(row, "job_type", "book") or "book",
+        parent_id=_row_value(row, "parent_id"),
+        source_path=_row_value(row, "source_path"),
+        status=row["status"],
+        progress=float(row["progress"]),
+        stage=row["stage"],
+        error=row["error"],
+        output_path=row["output_path"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+        started_at=row["started_at"],
+    )
+
+
+def _cached_job(db_path: str, job_id: str) -> Optional[Job]:
+    key = (db_path, job_id)
+    with _job_cache_lock:
+        cached = _job_cache.get(key)
+        if cached is None:
+            return None
+        if time.monotonic() - cached[0] >= JOB_CACHE_TTL_SECONDS:
+            del _job_cache[key]
+            return None
+        _job_cache.move_to_end(key)
+        return cached[1]
+
+
+def _job_cache_generation_now() -> int:
+    with _job_cache_lock:
+        return _job_cache_generation
+
+
+def _cache_job(db_path: str, job: Job, generation: int) -> None:
+    key = (db_path, job.id)
+    with _job_cache_lock:
+        # Skip rows read before a concurrent write landed.
+        if generation != _job_cache_generation:
+            return
+        _job_cache[key] = (time.monotonic(), job)
+        _job_cache.move_to_end(key)
+        while len(_job_cache) > JOB_CACHE_MAXSIZE:
+            _job_cache.popitem(last=False)
+
+
+async def _select_job(db: aiosqlite.Connection, job_id: str) -> Optional[Job]:
+    async with db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)) as cur:
+        row = await cur.fetchone()
+    return _job_from_row(row) if row is not None else None
 
 
 async def get_job(db_path: str, job_id: str) -> Optional[Job]:
-    async with aiosqlite.connect(db_path) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)) as cur:
-            row = await cur.fetchone()
-            if row is None:
-                return None
-            return Job(
-                id=row["id"],
-                topic=row["topic"],
-                model=row["model"] or "",
-                job_type=_row_value(row, "job_type", "book") or "book",
-                parent_id=_row_value(row, "parent_id"),
-                source_path=_row_value(row, "source_path"),
-                status=row["status"],
-                progress=float(row["progress"]),
-                stage=row["stage"],
-                error=row["error"],
-                output_path=row["output_path"],
-                created_at=row["created_at"],
-                updated_at=row["updated_at"],
-                started_at=row["started_at"],
-            )
+    cached = _cached_job(db_path, job_id)
+    if cached is not None:
+        return cached
+    generation = _job_cache_generation_now()
+    async with _connect(db_path) as db:
+        job = await _select_job(db, job_id)
+    if job is not None:
+        _cache_job(db_path, job, generation)
+    return job
+
+
+async def get_job_with_events(
+    db_path: str, job_id: str, limit: int = 200
+) -> tuple[Optional[Job], list[dict[str, Any]]]:
+    generation = _job_cache_generation_now()
+    async with _connect(db_path) as db:
+        job = _cached_job(db_path, job_id) or await _select_job(db, job_id)
+        if job is None:
+            return None, []
+        events = await _select_events(db, job_id, limit)
+    _cache_job(db_path, job, generation)
+    return job, events
 
 
 async def list_jobs(db_path: str, limit: int = 50) -> list[Job]:
-    async with aiosqlite.connect(db_path) as db:
+    async with _connect(db_path) as db:
         db.row_factory = aiosqlite.Row
         async with db.execute(
             """
@@ -362,7 +516,7 @@ async def list_jobs(db_path: str, limit: int = 50) -> list[Job]:
 
 
 async def get_next_queued_job(db_path: str) -> Optional[Job]:
-    async with aiosqlite.connect(db_path) as db:
+    async with _connect(db_path) as db:
         db.row_factory = aiosqlite.Row
         async with db.execute(
             """
@@ -395,8 +549,23 @@ async def get_next_queued_job(db_path: str) -> Optional[Job]:
             )
 
 
+async def list_queued_job_ids(db_path: str) -> list[str]:
+    async with _connect(db_path) as db:
+        async with db.execute(
+            """
+            SELECT id FROM jobs
+            WHERE status = 'queued'
+            ORDER BY
+                CASE WHEN job_type = 'recommend_topics' THEN 1 ELSE 0 END,
+                queue_position ASC
+            """
+        ) as cur:
+            rows = await cur.fetchall()
+            return [str(row[0]) for row in rows]
+
+
 async def has_active_job_type(db_path: str, job_type: str) -> bool:
-    async with aiosqlite.connect(db_path) as db:
+    async with _connect(db_path) as db:
         db.row_factory = aiosqlite.Row
         async with db.execute(
             """
@@ -411,7 +580,7 @@ async def has_active_job_type(db_path: str, job_type: str) -> bool:
 
 
 async def get_cache_entry(db_path: str, key: str) -> Optional[dict[str, str]]:
-    async with aiosqlite.connect(db_path) as db:
+    async with _connect(db_path) as db:
         db.row_factory = aiosqlite.Row
         async with db.execute(
             "SELECT key, value, updated_at FROM app_cache WHERE key = ?",
@@ -429,7 +598,7 @@ async def get_cache_entry(db_path: str, key: str) -> Optional[dict[str, str]]:
 
 async def set_cache_entry(db_path: str, key: str, value: str) -> None:
     now = _utc_now_iso()
-    async with aiosqlite.connect(db_path) as db:
+    async with _transaction(db_path) as db:
         await db.execute(
             """
             INSERT INTO app_cache (key, value, updated_at)
@@ -441,18 +610,20 @@ async def set_cache_entry(db_path: str, key: str, value: str) -> None:
         await db.commit()
 
 
-async def move_job(db_path: str, job_id: str, direction: str) -> None:
-    async with aiosqlite.connect(db_path) as db:
+async def move_job(db_path: str, job_id: str, direction: str) -> bool:
+    # Returns False when the job doesn't exist or is no longer queued.
+    async with _transaction(db_path) as db:
         db.row_factory = aiosqlite.Row
         async with db.execute(
-            "SELECT id, queue_position FROM jobs WHERE id = ?", (job_id,)
+            "SELECT id, queue_position FROM jobs WHERE id = ? AND status = 'queued'",
+            (job_id,),
         ) as cur:
             row = await cur.fetchone()
             if row is None:
-                return
+                return False
             current_pos = row["queue_position"]
             if current_pos is None:
-                return
+                return True
 
         if direction == "up":
             comparator = "<"
@@ -473,7 +644,7 @@ async def move_job(db_path: str, job_id: str, direction: str) -> None:
         ) as cur:
             neighbor = await cur.fetchone()
             if neighbor is None:
-                return
+                return True
 
         neighbor_id = neighbor["id"]
         neighbor_pos = neighbor["queue_position"]
@@ -487,10 +658,12 @@ async def move_job(db_path: str, job_id: str, direction: str) -> None:
             (current_pos, neighbor_id),
         )
         await db.commit()
+    _notify_change(job_id)
+    return True
 
 
 async def list_completed_jobs(db_path: str, limit: int = 200) -> list[Job]:
-    async with aiosqlite.connect(db_path) as db:
+    async with _connect(db_path) as db:
         db.row_factory = aiosqlite.Row
         async with db.execute(
             """
@@ -526,7 +699,7 @@ async def list_completed_jobs(db_path: str, limit: int = 200) -> list[Job]:
 
 
 async def list_child_jobs(db_path: str, parent_id: str) -> list[Job]:
-    async with aiosqlite.connect(db_path) as db:
+    async with _connect(db_path) as db:
         db.row_factory = aiosqlite.Row
         async with db.execute(
             """
@@ -564,7 +737,7 @@ async def list_child_jobs_for_parents(
     if not parent_ids:
         return {}
     placeholders = ",".join("?" for _ in parent_ids)
-    async with aiosqlite.connect(db_path) as db:
+    async with _connect(db_path) as db:
         db.row_factory = aiosqlite.Row
         async with db.execute(
             f"""
@@ -599,7 +772,7 @@ async def list_child_jobs_for_parents(
 
 
 async def list_recommended_topics(db_path: str, limit: int = 8) -> list[str]:
-    async with aiosqlite.connect(db_path) as db:
+    async with _connect(db_path) as db:
         db.row_factory = aiosqlite.Row
         async with db.execute(
             """
@@ -617,7 +790,7 @@ async def list_recommended_topics(db_path: str, limit: int = 8) -> list[str]:
 
 
 async def count_distinct_topics_since_last_recommend(db_path: str) -> int:
-    async with aiosqlite.connect(db_path) as db:
+    async with _connect(db_path) as db:
         db.row_factory = aiosqlite.Row
         async with db.execute(
             """
@@ -655,7 +828,7 @@ async def count_distinct_topics_since_last_recommend(db_path: str) -> int:
 
 
 async def list_recent_topics(db_path: str, limit: int = 12) -> list[str]:
-    async with aiosqlite.connect(db_path) as db:
+    async with _connect(db_path) as db:
         db.row_factory = aiosqlite.Row
         async with db.execute(
             """
@@ -687,7 +860,7 @@ async def list_recent_topics(db_path: str, limit: int = 12) -> list[str]:
 async def list_recent_jobs_summary(
     db_path: str, limit: int = 20
 ) -> list[dict[str, str]]:
-    async with aiosqlite.connect(db_path) as db:
+    async with _connect(db_path) as db:
         db.row_factory = aiosqlite.Row
         async with db.execute(
             """
@@ -714,8 +887,10 @@ async def list_recent_jobs_summary(
             return items
 
 
-async def get_queue_stats(db_path: str) -> dict[str, float | int | str | None]:
-    async with aiosqlite.connect(db_path) as db:
+async def get_queue_stats(
+    db_path: str, now: Optional[datetime] = None
+) -> dict[str, float | int | str | None]:
+    async with _connect(db_path) as db:
         db.row_factory = aiosqlite.Row
         async with db.execute(
             "SELECT status, progress, created_at, updated_at, started_at FROM jobs"
@@ -757,6 +932,7 @@ async def get_queue_stats(db_path: str) -> dict[str, float | int | str | None]:
                     created_at=row["created_at"],
                     started_at=row["started_at"],
                     progress=progress,
+                    now=now,
                 )
                 if eta is not None:
                     running_eta_seconds = eta
@@ -805,30 +981,77 @@ async def get_queue_stats(db_path: str) -> dict[str, float | int | str | None]:
 
 async def get_events(
     db_path: str, job_id: str, limit: int = 200
-) -> list[dict[str, str]]:
-    async with aiosqlite.connect(db_path) as db:
+) -> list[dict[str, Any]]:
+    async with _connect(db_path) as db:
+        return await _select_events(db, job_id, limit)
+
+
+async def _select_events(
+    db: aiosqlite.Connection, job_id: str, limit: int
+) -> list[dict[str, Any]]:
+    async with db.execute(
+        """
+        SELECT id, ts, level, message
+        FROM job_events
+        WHERE job_id = ?
+        ORDER BY id DESC
+        LIMIT ?
+        """,
+        (job_id, limit),
+    ) as cur:
+        rows = await cur.fetchall()
+    # Return chronological for nicer UI
+    return [
+        {
+            "id": r["id"],
+            "ts": r["ts"],
+            "level": r["level"],
+            "message": r["message"],
+        }
+        for r in reversed(rows)
+    ]
+
+
+async def get_events_after(
+    db_path: str, job_id: str, after_id: int, limit: int = 200
+) -> list[dict[str, Any]]:
+    async with _connect(db_path) as db:
         db.row_factory = aiosqlite.Row
         async with db.execute(
             """
-            SELECT ts, level, message
+            SELECT id, ts, level, message
             FROM job_events
-            WHERE job_id = ?
-            ORDER BY id DESC
+            WHERE job_id = ? AND id > ?
+            ORDER BY id ASC
             LIMIT ?
             """,
-            (job_id, limit),
+            (job_id, after_id, limit),
         ) as cur:
             rows = await cur.fetchall()
-            # Return chronological for nicer UI
-            rows = list(reversed(rows))
             return [
-                {"ts": r["ts"], "level": r["level"], "message": r["message"]}
+                {
+                    "id": r["id"],
+                    "ts": r["ts"],
+                    "level": r["level"],
+                    "message": r["message"],
+                }
                 for r in rows
             ]
 
 
-async def delete_job(db_path: str, job_id: str) -> None:
-    async with aiosqlite.connect(db_path) as db:
+async def delete_job(
+    db_path: str, job_id: str, *, unless_status: Optional[str] = None
+) -> bool:
+    sql = "DELETE FROM jobs WHERE id = ?"
+    params: tuple[str, ...] = (job_id,)
+    if unless_status is not None:
+        sql += " AND status != ?"
+        params += (unless_status,)
+    async with _transaction(db_path) as db:
+        cur = await db.execute(sql, params)
+        if cur.rowcount == 0:
+            return False
         await db.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
-        await db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
         await db.commit()
+    _notify_change(job_id)
+    return True
@@ -1,69 +1,174 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import os
+import re
 import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timezone
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
-
-from fastapi import FastAPI, Form, HTTPException, Request
-from fastapi.responses import HTMLResponse, RedirectResponse, Response
+from typing import Any, Callable, NoReturn, Optional, TypeVar
+from urllib.parse import quote
+
+import jinja2
+import orjson
+from fastapi import Depends, FastAPI, Form, HTTPException, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import (
+    FileResponse,
+    HTMLResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from starlette.types import Receive, Scope, Send
 
 from .eta import estimate_remaining_seconds, format_eta
 from .generator import markdown_to_text, run_job
 from .local_tts import LocalTTSError, synthesize_speech
-from .ollama_client import ensure_model_available, list_models
+from .ollama_client import close_clients, ensure_model_available, list_models
 from .pdf_export import render_markdown_to_pdf
 from .settings import settings
 from . import db
+from . import openai_tts
 
 
 BASE_DIR = Path(__file__).resolve().parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+
+
+def _template_bytecode_cache() -> jinja2.FileSystemBytecodeCache:
+    # Kept beside the templates so compiled bytecode survives restarts and is
+    # shared by every worker; fall back to the temp dir if it isn't writable.
+    cache_dir = BASE_DIR / ".jinja_cache"
+    try:
+        cache_dir.mkdir(exist_ok=True)
+    except OSError:
+        return jinja2.FileSystemBytecodeCache()
+    return jinja2.FileSystemBytecodeCache(directory=str(cache_dir))
+
+
+# Templates only change on deploy, so skip the per-render stat() and keep
+# every compiled template; TEMPLATES_AUTO_RELOAD=true restores hot reload.
+template_env = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(str(BASE_DIR / "templates")),
+    autoescape=True,
+    auto_reload=settings.templates_auto_reload,
+    cache_size=-1,
+    bytecode_cache=_template_bytecode_cache(),
+)
+templates = Jinja2Templates(env=template_env)
 static_dir = BASE_DIR / "static"
 static_dir.mkdir(exist_ok=True)
 
 
 class JobRunner:
     def __init__(self) -> None:
-        self.queue: asyncio.Queue[str] = asyncio.Queue()
+        # None is the shutdown sentinel.
+        self.queue: asyncio.Queue[Optional[str]] = asyncio.Queue()
         self._task: Optional[asyncio.Task[None]] = None
-        self._stop = asyncio.Event()
-        self._wake = asyncio.Event()
+        self._idle = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed = asyncio.Condition()
+        self.version = 0
+        self._subscribers: dict[str, set[asyncio.Queue[None]]] = {}
 
     async def start(self) -> None:
         if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            db.add_change_listener(self._on_db_change)
+            # Jobs left queued by a previous process are only discovered here.
+            for job_id in await db.list_queued_job_ids(settings.db_path):
+                self.queue.put_nowait(job_id)
             self._task = asyncio.create_task(self._run_loop())
 
     async def stop(self) -> None:
-        self._stop.set()
+        db.remove_change_listener(self._on_db_change)
         if self._task:
-            self._task.cancel()
+            # Pending ids are only wake-ups; the jobs stay queued in the DB and
+            # are picked up again by the next start().
+            self._drain_queue()
+            self.queue.put_nowait(None)
+            if not self._idle:
+                self._task.cancel()
             try:
                 await self._task
             except asyncio.CancelledError:
                 pass
             self._task = None
+            self._drain_queue()
+
+    def _drain_queue(self) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
 
     async def enqueue(self, job_id: str) -> None:
         await self.queue.put(job_id)
-        self._wake.set()
+
+    async def enqueue_many(self, job_ids: list[str]) -> None:
+        # The queue is unbounded, so put_nowait never blocks.
+        for job_id in job_ids:
+            self.queue.put_nowait(job_id)
+
+    def _on_db_change(self, job_id: str) -> None:
+        # Job writes come from worker threads running their own event loop.
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._dispatch_change, job_id)
+
+    def _dispatch_change(self, job_id: str) -> None:
+        for changes in self._subscribers.get(job_id, ()):
+            # One pending wake-up is enough; the stream re-reads the job anyway.
+            if changes.empty():
+                changes.put_nowait(None)
+        asyncio.ensure_future(self._notify_changed())
+
+    def subscribe(self, job_id: str) -> asyncio.Queue[None]:
+        changes: asyncio.Queue[None] = asyncio.Queue(maxsize=1)
+        self._subscribers.setdefault(job_id, set()).add(changes)
+        return changes
+
+    def unsubscribe(self, job_id: str, changes: asyncio.Queue[None]) -> None:
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is not None:
+            subscribers.discard(changes)
+            if not subscribers:
+                del self._subscribers[job_id]
+
+    async def _notify_changed(self) -> None:
+        async with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    async def wait_for_change(self, seen_version: int, timeout: float) -> int:
+        async with self._changed:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: self.version != seen_version),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                pass
+            return self.version
 
     async def _run_loop(self) -> None:
-        while not self._stop.is_set():
+        while True:
+            # Idle until a job is enqueued or stop() sends the sentinel.
+            self._idle = True
+            job_id = await self.queue.get()
+            self._idle = False
+            if job_id is None:
+                return
+            # Queue entries only signal that work exists. The next job is
+            # still picked from the DB so manual reordering and priorities
+            # apply, and cancelled or stopped jobs are skipped.
             job = await db.get_next_queued_job(settings.db_path)
             if job is None:
-                try:
-                    await asyncio.wait_for(self._wake.wait(), timeout=1.0)
-                    self._wake.clear()
-                except asyncio.TimeoutError:
-                    continue
-                continue
-            if job.status in {"cancelled", "stopped"}:
                 continue
 
             await _run_job_background(
@@ -77,7 +182,20 @@ class JobRunner:
             )
 
 
+class SelectiveGZipMiddleware(GZipMiddleware):
+    # GZip buffers the body, which would hold back SSE frames, and audio/PDF
+    # are already compressed; those routes pass through untouched.
+    skip_suffixes = ("/stream", "/audiobook", "/tts", "/download.pdf")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].endswith(self.skip_suffixes):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
 app = FastAPI(title="Uncensored LLM Book + Audio Factory")
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # Mount static files directory
 app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
@@ -90,11 +208,11 @@ _models_cache: dict[str, object] = {
     "value": [],
     "updated_at": 0.0,
     "in_flight": False,
+    "task": None,
 }
 
 
 async def _refresh_models() -> None:
-    _models_cache["in_flight"] = True
     try:
         result = await list_models(
             base_url=settings.ollama_base_url,
@@ -102,23 +220,136 @@ async def _refresh_models() -> None:
         )
     except Exception:
         result = []
-    _models_cache["value"] = result
+    # A failed refresh keeps serving the last good list until the next TTL.
+    if result or not _models_cache["value"]:
+        _models_cache["value"] = result
     _models_cache["updated_at"] = time.monotonic()
     _models_cache["in_flight"] = False
 
 
+def _schedule_models_refresh() -> None:
+    if _models_cache["in_flight"]:
+        return
+    _models_cache["in_flight"] = True
+    _models_cache["task"] = asyncio.create_task(_refresh_models())
+
+
+def _cached_models() -> list[str]:
+    now = time.monotonic()
+    if now - float(_models_cache["updated_at"]) >= MODELS_TTL_SECONDS:
+        _schedule_models_refresh()
+    models = list(_models_cache["value"])
+    if settings.ollama_model and settings.ollama_model not in models:
+        models.append(settings.ollama_model)
+    return models or [settings.ollama_model]
+
+
+_recommended_cache: dict[str, object] = {
+    "key": None,
+    "value": [],
+}
+
+
+def _parse_recommended_topics(cache_entry: dict[str, str]) -> list[str]:
+    key = (cache_entry["updated_at"], cache_entry["value"][:32])
+    if _recommended_cache["key"] == key:
+        return _recommended_cache["value"]
+    topics: list[str] = []
+    try:
+        cached = orjson.loads(cache_entry["value"])
+        if isinstance(cached, list):
+            topics = [str(item).strip() for item in cached if str(item).strip()]
+    except (TypeError, orjson.JSONDecodeError, ValueError):
+        topics = []
+    _recommended_cache["key"] = key
+    _recommended_cache["value"] = topics
+    return topics
+
+
+STREAM_KEEPALIVE_SECONDS = 15.0
+
+# Markdown and PDF rendering are CPU-bound; a small dedicated pool keeps them
+# off the event loop without letting a burst of readers starve to_thread work.
+_render_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="render")
+_T = TypeVar("_T")
+
+
+async def _run_render(func: Callable[..., _T], *args: Any) -> _T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_render_executor, func, *args)
+
+
+_queue_stream_lock = asyncio.Lock()
+_queue_stream_cache: dict[str, object] = {"version": None, "html": ""}
+
+
+def _sse_event(event: str, data: str, event_id: Optional[int] = None) -> str:
+    lines = "".join(f"data: {line}\n" for line in data.splitlines() or [""])
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"event: {event}\n{id_line}{lines}\n"
+
+
+async def _render_queue_stream(version: int) -> str:
+    # Every subscriber wakes on the same change; only the first one queries.
+    async with _queue_stream_lock:
+        if _queue_stream_cache["version"] != version:
+            queue_stats = await db.get_queue_stats(settings.db_path)
+            _queue_stream_cache["html"] = templates.get_template(
+                "partials/queue_status.html"
+            ).render(queue_stats=queue_stats)
+            _queue_stream_cache["version"] = version
+        return str(_queue_stream_cache["html"])
+
+
+async def _render_job_stream(
+    job_id: str, after_id: int
+) -> tuple[dict[str, str], int]:
+    job = await db.get_job(settings.db_path, job_id)
+    if job is None:
+        return {}, after_id
+    frames = {
+        "status": templates.get_template("partials/job_status.html").render(
+            job=job, eta_text=_job_eta_text(job)
+        ),
+    }
+    # Only rows the client has not seen yet; the page appends them.
+    events = await db.get_events_after(settings.db_path, job_id, after_id)
+    if events:
+        frames["events"] = templates.get_template(
+            "partials/job_events_tail.html"
+        ).render(events=events, clear_placeholder=after_id == 0)
+        after_id = int(events[-1]["id"])
+    return frames, after_id
+
+
 def _run_job_sync(**kwargs: object) -> None:
-    asyncio.run(run_job(**kwargs))
+    asyncio.run(_run_job_on_own_loop(**kwargs))
+
+
+async def _run_job_on_own_loop(**kwargs: object) -> None:
+    try:
+        await run_job(**kwargs)
+    finally:
+        # Pooled clients belong to this loop, which asyncio.run is about to close.
+        await close_clients()
+        await openai_tts.close_clients()
 
 
 async def _run_job_background(**kwargs: object) -> None:
     await asyncio.to_thread(_run_job_sync, **kwargs)
 
 
+def _render_template(name: str, context: dict[str, Any]) -> HTMLResponse:
+    # Renders straight from the environment; TemplateResponse adds context
+    # processors and debug hooks this app never uses.
+    return HTMLResponse(templates.get_template(name).render(context))
+
+
 @app.on_event("startup")
 async def on_startup() -> None:
     os.makedirs(settings.data_dir, exist_ok=True)
     await db.init_db(settings.db_path)
+    await db.open_shared_connection(settings.db_path)
     if settings.ollama_auto_pull and settings.ollama_model:
         try:
             await ensure_model_available(
@@ -128,65 +359,48 @@ async def on_startup() -> None:
             )
         except Exception as exc:  # noqa: BLE001
             logger.warning("Failed to auto-pull Ollama model: %s", exc)
+    for name in template_env.list_templates():
+        template_env.get_template(name)
+    _schedule_models_refresh()
     await runner.start()
 
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
     await runner.stop()
+    await db.close_shared_connection(settings.db_path)
+    await close_clients()
+    await openai_tts.close_clients()
 
 
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request) -> Response:
-    queue_jobs = await db.list_jobs(settings.db_path, limit=200)
-    queue_stats = await db.get_queue_stats(settings.db_path)
+    queue_jobs, queue_stats, cache_entry, completed_jobs = await asyncio.gather(
+        db.list_jobs(settings.db_path, limit=200),
+        db.get_queue_stats(settings.db_path),
+        db.get_cache_entry(settings.db_path, "recommended_topics"),
+        db.list_completed_jobs(settings.db_path, limit=200),
+    )
     recommended_topics: list[str] = []
-    cache_entry = await db.get_cache_entry(settings.db_path, "recommended_topics")
     if cache_entry:
-        try:
-            cached = json.loads(cache_entry["value"])
-            if isinstance(cached, list):
-                recommended_topics = [
-                    str(item).strip() for item in cached if str(item).strip()
-                ]
-        except (TypeError, json.JSONDecodeError, ValueError):
-            recommended_topics = []
+        recommended_topics = _parse_recommended_topics(cache_entry)
 
-    now = time.monotonic()
-    models_cache_fresh = now - float(_models_cache["updated_at"]) < MODELS_TTL_SECONDS
-    if not models_cache_fresh and not _models_cache["in_flight"]:
-        asyncio.create_task(_refresh_models())
-    models = _models_cache["value"] if _models_cache["value"] else []
-    if settings.ollama_model and settings.ollama_model not in models:
-        models.append(settings.ollama_model)
-    if not models:
-        models = [settings.ollama_model]
+    models = _cached_models()
     
     # Get child jobs for queue items (for expandable display)
-    queue_child_map = await db.list_child_jobs_for_parents(
-        settings.db_path, [job.id for job in queue_jobs]
-    )
-    
-    completed_jobs = await db.list_completed_jobs(settings.db_path, limit=200)
-    child_map = await db.list_child_jobs_for_parents(
-        settings.db_path, [job.id for job in completed_jobs]
+    queue_child_map, child_map = await asyncio.gather(
+        db.list_child_jobs_for_parents(
+            settings.db_path, [job.id for job in queue_jobs]
+        ),
+        db.list_child_jobs_for_parents(
+            settings.db_path, [job.id for job in completed_jobs]
+        ),
     )
+    # Asset checks and title lookups touch disk for every book; do them all in
+    # one worker thread rather than on the event loop.
+    library_files = await asyncio.to_thread(_scan_library_files, completed_jobs)
     library_items: list[dict[str, object]] = []
-    for job in completed_jobs:
-        assets: dict[str, object] | None = None
-        book_title = job.topic
-        if job.output_path:
-            md_path = Path(job.output_path)
-            derived = _derive_book_assets(md_path)
-            assets = {
-                "text_ready": derived["text"].exists(),
-                "mp3_ready": derived["mp3"].exists(),
-                "m4b_ready": derived["m4b"].exists(),
-                "text_url": f"/jobs/{job.id}/download.txt",
-                "mp3_url": f"/jobs/{job.id}/audiobook?format=mp3",
-                "m4b_url": f"/jobs/{job.id}/audiobook?format=m4b",
-            }
-            book_title = _extract_book_title(job, md_path)
+    for job, (assets, book_title) in zip(completed_jobs, library_files):
         children = child_map.get(job.id, [])
         child_status = {c.job_type: c.status for c in children}
         library_items.append(
@@ -198,7 +412,7 @@ async def index(request: Request) -> Response:
             }
         )
 
-    return templates.TemplateResponse(
+    return _render_template(
         "index.html",
         {
             "request": request,
@@ -245,9 +459,7 @@ async def create_job(topic: str = Form(...), model: str = Form(default="")) -> R
         await db.append_event(settings.db_path, child.id, "info", message)
         child_ids.append(child.id)
 
-    await runner.enqueue(job.id)
-    for child_id in child_ids:
-        await runner.enqueue(child_id)
+    await runner.enqueue_many([job.id, *child_ids])
     distinct_topics = await db.count_distinct_topics_since_last_recommend(
         settings.db_path
     )
@@ -274,196 +486,232 @@ async def create_job(topic: str = Form(...), model: str = Form(default="")) -> R
 
 @app.post("/jobs/{job_id}/cancel")
 async def cancel_job(job_id: str) -> Response:
-    job = await db.get_job(settings.db_path, job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    if job.status in {"completed", "failed", "cancelled"}:
-        raise HTTPException(status_code=400, detail="Job cannot be cancelled")
-    await db.set_job_status(
-        settings.db_path, job.id, status="cancelled", stage="cancelled"
+    cancelled = await db.update_job_status_if(
+        settings.db_path,
+        job_id,
+        from_statuses=("queued", "running", "stopped"),
+        status="cancelled",
+        stage="cancelled",
+        event="Job cancelled",
     )
-    await db.append_event(settings.db_path, job.id, "info", "Job cancelled")
-    return RedirectResponse(url=f"/jobs/{job.id}", status_code=303)
+    if not cancelled:
+        await _raise_transition_error(job_id, "Job cannot be cancelled")
+    return RedirectResponse(url=f"/jobs/{job_id}", status_code=303)
 
 
 @app.post("/jobs/{job_id}/stop")
 async def stop_job(job_id: str) -> Response:
-    job = await db.get_job(settings.db_path, job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    if job.status not in {"running"}:
-        raise HTTPException(status_code=400, detail="Only running jobs can be stopped")
-    await db.set_job_status(settings.db_path, job.id, status="stopped", stage="stopped")
-    await db.append_event(settings.db_path, job.id, "info", "Job stopped")
-    return RedirectResponse(url=f"/jobs/{job.id}", status_code=303)
+    stopped = await db.update_job_status_if(
+        settings.db_path,
+        job_id,
+        from_statuses=("running",),
+        status="stopped",
+        stage="stopped",
+        event="Job stopped",
+    )
+    if not stopped:
+        await _raise_transition_error(job_id, "Only running jobs can be stopped")
+    return RedirectResponse(url=f"/jobs/{job_id}", status_code=303)
 
 
 @app.post("/jobs/{job_id}/resume")
 async def resume_job(job_id: str) -> Response:
-    job = await db.get_job(settings.db_path, job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    if job.status != "stopped":
-        raise HTTPException(status_code=400, detail="Only stopped jobs can be resumed")
-    await db.set_job_status(
+    resumed = await db.update_job_status_if(
         settings.db_path,
-        job.id,
+        job_id,
+        from_statuses=("stopped",),
         status="queued",
         stage="queued",
         progress=0.0,
-        error=None,
-        output_path=None,
+        event="Job resumed",
     )
-    await db.append_event(settings.db_path, job.id, "info", "Job resumed")
-    await runner.enqueue(job.id)
-    return RedirectResponse(url=f"/jobs/{job.id}", status_code=303)
+    if not resumed:
+        await _raise_transition_error(job_id, "Only stopped jobs can be resumed")
+    await runner.enqueue(job_id)
+    return RedirectResponse(url=f"/jobs/{job_id}", status_code=303)
 
 
 @app.post("/jobs/{job_id}/retry")
 async def retry_job(job_id: str) -> Response:
-    job = await db.get_job(settings.db_path, job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    if job.status not in {"failed", "cancelled"}:
-        raise HTTPException(
-            status_code=400, detail="Only failed or cancelled jobs can be retried"
-        )
-    await db.set_job_status(
+    retried = await db.update_job_status_if(
         settings.db_path,
-        job.id,
+        job_id,
+        from_statuses=("failed", "cancelled"),
         status="queued",
         stage="queued",
         progress=0.0,
-        error=None,
-        output_path=None,
+        event="Job retried",
     )
-    await db.append_event(settings.db_path, job.id, "info", "Job retried")
-    await runner.enqueue(job.id)
-    return RedirectResponse(url=f"/jobs/{job.id}", status_code=303)
+    if not retried:
+        await _raise_transition_error(
+            job_id, "Only failed or cancelled jobs can be retried"
+        )
+    await runner.enqueue(job_id)
+    return RedirectResponse(url=f"/jobs/{job_id}", status_code=303)
 
 
 @app.post("/jobs/{job_id}/delete")
 async def delete_job(job_id: str) -> Response:
-    job = await db.get_job(settings.db_path, job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    if job.status == "running":
-        raise HTTPException(
-            status_code=400, detail="Stop or cancel running job before delete"
+    deleted = await db.delete_job(settings.db_path, job_id, unless_status="running")
+    if not deleted:
+        await _raise_transition_error(
+            job_id, "Stop or cancel running job before delete"
         )
-    await db.delete_job(settings.db_path, job.id)
     return RedirectResponse(url="/#queue", status_code=303)
 
 
 @app.post("/jobs/{job_id}/move")
 async def move_job(job_id: str, direction: str = Form(...)) -> Response:
-    job = await db.get_job(settings.db_path, job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    if job.status != "queued":
-        raise HTTPException(status_code=400, detail="Only queued jobs can be moved")
     if direction not in {"up", "down"}:
         raise HTTPException(status_code=400, detail="Invalid direction")
-    await db.move_job(settings.db_path, job.id, direction)
+    if not await db.move_job(settings.db_path, job_id, direction):
+        await _raise_transition_error(job_id, "Only queued jobs can be moved")
     return RedirectResponse(url="/#queue", status_code=303)
 
 
+async def _raise_transition_error(job_id: str, detail: str) -> NoReturn:
+    # Only reached when a conditional write matched nothing; tell a missing
+    # job apart from one in the wrong state.
+    if await db.get_job(settings.db_path, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    raise HTTPException(status_code=400, detail=detail)
+
+
 @app.get("/jobs", response_class=HTMLResponse)
 async def jobs_page(request: Request) -> Response:
     return RedirectResponse(url="/#queue", status_code=303)
 
 
-@app.get("/partials/queue_status", response_class=HTMLResponse)
-async def queue_status_partial(request: Request) -> Response:
-    queue_stats = await db.get_queue_stats(settings.db_path)
-    return templates.TemplateResponse(
-        "partials/queue_status.html",
-        {"request": request, "queue_stats": queue_stats},
+@app.get("/stream")
+async def stream(request: Request) -> Response:
+    async def event_stream():
+        sent: dict[str, str] = {}
+        version = runner.version
+        while not await request.is_disconnected():
+            html = await _render_queue_stream(version)
+            if sent.get("queue") != html:
+                sent["queue"] = html
+                yield _sse_event("queue", html)
+            latest = await runner.wait_for_change(version, STREAM_KEEPALIVE_SECONDS)
+            if latest == version:
+                yield ": keep-alive\n\n"
+            version = latest
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.get("/jobs/{job_id}/stream")
+async def job_stream(request: Request, job_id: str, after: int = 0) -> Response:
+    if await db.get_job(settings.db_path, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    last_event_id = request.headers.get("last-event-id", "")
+    after_id = int(last_event_id) if last_event_id.isdigit() else after
+
+    async def event_stream():
+        nonlocal after_id
+        sent: dict[str, str] = {}
+        # Only writes to this job wake the stream, not every job in the queue.
+        changes = runner.subscribe(job_id)
+        try:
+            while not await request.is_disconnected():
+                frames, after_id = await _render_job_stream(job_id, after_id)
+                for event, html in frames.items():
+                    if sent.get(event) != html:
+                        sent[event] = html
+                        event_id = after_id if event == "events" else None
+                        yield _sse_event(event, html, event_id)
+                try:
+                    await asyncio.wait_for(changes.get(), STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            runner.unsubscribe(job_id, changes)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
     )
 
 
 @app.get("/jobs/{job_id}", response_class=HTMLResponse)
 async def job_detail(request: Request, job_id: str) -> Response:
-    job = await db.get_job(settings.db_path, job_id)
+    job, events = await db.get_job_with_events(settings.db_path, job_id, limit=200)
     if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    events = await db.get_events(settings.db_path, job_id, limit=200)
-    eta_text = None
-    if job.status == "running" and job.progress > 0:
-        eta_seconds = estimate_remaining_seconds(
-            created_at=job.created_at, progress=job.progress
-        )
-        eta_text = format_eta(eta_seconds)
-    return templates.TemplateResponse(
+    eta_text = _job_eta_text(job)
+    return _render_template(
         "job_detail.html",
         {"request": request, "job": job, "events": events, "eta_text": eta_text},
     )
 
 
-@app.get("/jobs/{job_id}/partials/status", response_class=HTMLResponse)
-async def job_status_partial(request: Request, job_id: str) -> Response:
-    job = await db.get_job(settings.db_path, job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    eta_text = None
-    if job.status == "running" and job.progress > 0:
-        eta_seconds = estimate_remaining_seconds(
-            created_at=job.created_at, progress=job.progress
-        )
-        eta_text = format_eta(eta_seconds)
-    return templates.TemplateResponse(
-        "partials/job_status.html",
-        {"request": request, "job": job, "eta_text": eta_text},
-    )
+CompletedBook = tuple[db.Job, Path, dict[str, Path]]
 
 
-@app.get("/jobs/{job_id}/partials/events", response_class=HTMLResponse)
-async def job_events_partial(request: Request, job_id: str) -> Response:
+async def get_completed_book(request: Request, job_id: str) -> CompletedBook:
     job = await db.get_job(settings.db_path, job_id)
     if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    events = await db.get_events(settings.db_path, job_id, limit=200)
-    return templates.TemplateResponse(
-        "partials/job_events.html",
-        {"request": request, "job": job, "events": events},
-    )
+    if job.status != "completed" or not job.output_path:
+        raise HTTPException(status_code=400, detail="Job not completed")
+    md_path = Path(job.output_path)
+    try:
+        request.state.book_stat = md_path.stat()
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Output file missing") from exc
+    return job, md_path, _derive_book_assets(md_path)
 
 
 @app.get("/jobs/{job_id}/download")
-async def download_book(job_id: str) -> Response:
-    job = await db.get_job(settings.db_path, job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    if job.status != "completed" or not job.output_path:
-        raise HTTPException(status_code=400, detail="Job not completed")
-    path = Path(job.output_path)
-    if not path.exists():
-        raise HTTPException(status_code=404, detail="Output file missing")
-    data = path.read_bytes()
-    return Response(
-        content=data,
+async def download_book(
+    request: Request, book: CompletedBook = Depends(get_completed_book)
+) -> Response:
+    _, md_path, _ = book
+    return _file_response(
+        request,
+        md_path,
         media_type="text/markdown; charset=utf-8",
-        headers={"Content-Disposition": f"attachment; filename={path.name}"},
+        filename=md_path.name,
+        stat_result=request.state.book_stat,
     )
 
 
 @app.get("/jobs/{job_id}/read", response_class=HTMLResponse)
-async def read_book(request: Request, job_id: str) -> Response:
-    job = await db.get_job(settings.db_path, job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    if job.status != "completed" or not job.output_path:
-        raise HTTPException(status_code=400, detail="Job not completed")
-    md_path = Path(job.output_path)
-    if not md_path.exists():
-        raise HTTPException(status_code=404, detail="Output file missing")
+async def read_book(
+    request: Request, book: CompletedBook = Depends(get_completed_book)
+) -> Response:
+    job, md_path, _ = book
 
     try:
-        from markdown import Markdown  # lazy import
+        html_body = await _run_render(
+            _render_book_html_cached,
+            job.id,
+            request.state.book_stat.st_mtime_ns,
+            str(md_path),
+        )
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(
             status_code=500, detail=f"Markdown rendering failed: {exc}"
         ) from exc
+    return _render_template(
+        "read.html",
+        {
+            "request": request,
+            "job": job,
+            "html_body": html_body,
+            "local_tts_default_voice": settings.local_tts_default_voice,
+            "body_class": "read-view bg-slate-100 text-slate-900",
+        },
+    )
+
+
+def _render_book_html(md_path: Path) -> str:
+    from markdown import Markdown  # lazy import
 
     md_text = md_path.read_text(encoding="utf-8")
     renderer = Markdown(
@@ -478,19 +726,99 @@ async def read_book(request: Request, job_id: str) -> Response:
             "toc": {"permalink": False, "toc_depth": "2-4"},
         },
     )
-    html_body = renderer.convert(md_text)
-    return templates.TemplateResponse(
-        "read.html",
-        {
-            "request": request,
-            "job": job,
-            "html_body": html_body,
-            "local_tts_default_voice": settings.local_tts_default_voice,
-            "body_class": "read-view bg-slate-100 text-slate-900",
-        },
+    return renderer.convert(md_text)
+
+
+@lru_cache(maxsize=128)
+def _render_book_html_cached(job_id: str, mtime_ns: int, md_path_str: str) -> str:
+    # The rendered body is also kept next to the markdown (like the .pdf) so
+    # it survives restarts; a newer markdown mtime invalidates both.
+    md_path = Path(md_path_str)
+    html_path = md_path.with_suffix(".html")
+    try:
+        if html_path.stat().st_mtime_ns >= mtime_ns:
+            return html_path.read_text(encoding="utf-8")
+    except OSError:
+        pass
+    html_body = _render_book_html(md_path)
+    try:
+        html_path.write_text(html_body, encoding="utf-8")
+    except OSError:
+        logger.warning("Could not persist rendered HTML to %s", html_path)
+    return html_body
+
+
+def _export_book_pdf(md_path: Path, pdf_path: Path) -> None:
+    render_markdown_to_pdf(md_path.read_text(encoding="utf-8"), pdf_path)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if request.headers.get("if-none-match") is not None:
+        return _etag_matches(request, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # "-0000" and some other legal forms parse naive; they are still UTC.
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return int(mtime) <= since.timestamp()
+    return False
+
+
+@lru_cache(maxsize=256)
+def _content_disposition(filename: str) -> str:
+    # Same book files are downloaded repeatedly; build each header once.
+    safe = re.sub(r'["\\\r\n]', "_", filename)
+    if safe.isascii():
+        return f'attachment; filename="{safe}"'
+    fallback = safe.encode("ascii", "replace").decode().replace("?", "_")
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
+
+def _file_response(
+    request: Request,
+    path: Path,
+    *,
+    media_type: str,
+    filename: Optional[str] = None,
+    stat_result: Optional[os.stat_result] = None,
+) -> Response:
+    if stat_result is None:
+        stat_result = path.stat()
+    etag = f'W/"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+    }
+    if _is_not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=304, headers=headers)
+    if filename:
+        headers["Content-Disposition"] = _content_disposition(filename)
+    return FileResponse(
+        path, media_type=media_type, headers=headers, stat_result=stat_result
     )
 
 
+def _job_eta_text(job: db.Job) -> Optional[str]:
+    if job.status == "running" and job.progress > 0:
+        eta_seconds = estimate_remaining_seconds(
+            created_at=job.created_at, progress=job.progress
+        )
+        return format_eta(eta_seconds)
+    return None
+
+
 def _derive_book_assets(md_path: Path) -> dict[str, Path]:
     base = md_path.with_suffix("")
     return {
@@ -500,162 +828,209 @@ def _derive_book_assets(md_path: Path) -> dict[str, Path]:
     }
 
 
+def _tts_audio_path(md_path: Path, voice: str, speed: float) -> Path:
+    # Never the audiobook job's own mp3, so the two can't write the same file.
+    voice_slug = re.sub(r"[^A-Za-z0-9_-]+", "_", voice).strip("_") or "voice"
+    return md_path.with_name(f"{md_path.stem}.{voice_slug}.{int(speed * 100)}.mp3")
+
+
+_tts_locks: weakref.WeakValueDictionary[Path, asyncio.Lock] = (
+    weakref.WeakValueDictionary()
+)
+
+
+def _tts_lock(path: Path) -> asyncio.Lock:
+    lock = _tts_locks.get(path)
+    if lock is None:
+        lock = asyncio.Lock()
+        _tts_locks[path] = lock
+    return lock
+
+
+def _write_bytes_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+async def _audiobook_mp3_ready(job_id: str, mp3_path: Path) -> bool:
+    if not mp3_path.exists():
+        return False
+    children = await db.list_child_jobs(settings.db_path, job_id)
+    return any(
+        child.job_type == "audiobook" and child.status == "completed"
+        for child in children
+    )
+
+
+def _scan_library_files(
+    jobs: list[db.Job],
+) -> list[tuple[dict[str, object] | None, str]]:
+    results: list[tuple[dict[str, object] | None, str]] = []
+    for job in jobs:
+        if not job.output_path:
+            results.append((None, job.topic))
+            continue
+        md_path = Path(job.output_path)
+        derived = _derive_book_assets(md_path)
+        assets: dict[str, object] = {
+            "text_ready": derived["text"].exists(),
+            "mp3_ready": derived["mp3"].exists(),
+            "m4b_ready": derived["m4b"].exists(),
+            "text_url": f"/jobs/{job.id}/download.txt",
+            "mp3_url": f"/jobs/{job.id}/audiobook?format=mp3",
+            "m4b_url": f"/jobs/{job.id}/audiobook?format=m4b",
+        }
+        results.append((assets, _extract_book_title(job, md_path)))
+    return results
+
+
 def _extract_book_title(job: db.Job, md_path: Path) -> str:
     outline_path = md_path.parent / "outline.json"
     if outline_path.exists():
         try:
-            data = json.loads(outline_path.read_text(encoding="utf-8"))
+            data = orjson.loads(outline_path.read_bytes())
             title = str(data.get("title") or "").strip()
             if title:
                 return title
-        except (json.JSONDecodeError, OSError, ValueError, TypeError):
+        except (orjson.JSONDecodeError, OSError, ValueError, TypeError):
             pass
 
     try:
-        for line in md_path.read_text(encoding="utf-8").splitlines():
-            stripped = line.strip()
-            if not stripped:
-                continue
-            if stripped.startswith("#"):
-                stripped = stripped.lstrip("#").strip()
-                if stripped:
-                    return stripped
-            break
+        with md_path.open(encoding="utf-8") as handle:
+            for line in handle:
+                stripped = line.strip()
+                if not stripped:
+                    continue
+                if stripped.startswith("#"):
+                    stripped = stripped.lstrip("#").strip()
+                    if stripped:
+                        return stripped
+                break
     except OSError:
         pass
     return job.topic
 
 
+def _prepare_text(md_path: Path, text_path: Path) -> str:
+    md_text = md_path.read_text(encoding="utf-8")
+    text = markdown_to_text(md_text)
+    text_path.write_text(text, encoding="utf-8")
+    return text
+
+
 @app.post("/jobs/{job_id}/tts")
 async def read_book_tts(
-    job_id: str,
+    book: CompletedBook = Depends(get_completed_book),
     voice: str = Form(default=""),
     speed: float = Form(default=1.0),
 ) -> Response:
-    job = await db.get_job(settings.db_path, job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    if job.status != "completed" or not job.output_path:
-        raise HTTPException(status_code=400, detail="Job not completed")
-
-    md_path = Path(job.output_path)
-    if not md_path.exists():
-        raise HTTPException(status_code=404, detail="Output file missing")
-
-    assets = _derive_book_assets(md_path)
-    if assets["mp3"].exists():
-        data = assets["mp3"].read_bytes()
-        return Response(content=data, media_type="audio/mpeg")
-
+    job, md_path, assets = book
+    voice = voice or settings.local_tts_default_voice
+    speed = max(0.5, min(2.0, speed))
+    if (
+        voice == settings.local_tts_default_voice
+        and speed == settings.local_tts_default_speed
+        and await _audiobook_mp3_ready(job.id, assets["mp3"])
+    ):
+        return FileResponse(assets["mp3"], media_type="audio/mpeg")
+
+    audio_path = _tts_audio_path(md_path, voice, speed)
+    # One synthesis per file; later requests wait and then serve it.
+    async with _tts_lock(audio_path):
+        if not audio_path.exists():
+            await _synthesize_tts_file(md_path, assets, voice, speed, audio_path)
+    return FileResponse(audio_path, media_type="audio/mpeg")
+
+
+async def _synthesize_tts_file(
+    md_path: Path,
+    assets: dict[str, Path],
+    voice: str,
+    speed: float,
+    audio_path: Path,
+) -> None:
     text_path = assets["text"]
     if text_path.exists():
-        text = text_path.read_text(encoding="utf-8")
+        text = await asyncio.to_thread(text_path.read_text, encoding="utf-8")
     else:
-        md_text = md_path.read_text(encoding="utf-8")
-        text = markdown_to_text(md_text)
-        text_path.write_text(text, encoding="utf-8")
+        text = await asyncio.to_thread(_prepare_text, md_path, text_path)
     if not text.strip():
         raise HTTPException(status_code=400, detail="Book is empty")
 
-    speed = max(0.5, min(2.0, speed))
     try:
         audio = await synthesize_speech(
             text=text,
-            voice=voice or settings.local_tts_default_voice,
+            voice=voice,
             speed=speed,
             format="mp3",
         )
     except LocalTTSError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
-    assets["mp3"].write_bytes(audio)
-    return Response(content=audio, media_type="audio/mpeg")
+    # Written beside the target and renamed in, so readers never see a partial mp3.
+    await asyncio.to_thread(_write_bytes_atomic, audio_path, audio)
 
 
 @app.get("/jobs/{job_id}/audiobook")
 async def audiobook_download(
-    job_id: str,
+    request: Request,
+    book: CompletedBook = Depends(get_completed_book),
     format: str = "mp3",
 ) -> Response:
     fmt = format.lower().strip()
     if fmt not in {"mp3", "m4b"}:
         raise HTTPException(status_code=400, detail="Unsupported audio format")
 
-    job = await db.get_job(settings.db_path, job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    if job.status != "completed" or not job.output_path:
-        raise HTTPException(status_code=400, detail="Job not completed")
-
-    md_path = Path(job.output_path)
-    if not md_path.exists():
-        raise HTTPException(status_code=404, detail="Output file missing")
-
-    assets = _derive_book_assets(md_path)
+    _, _, assets = book
     target_path = assets[fmt]
     if not target_path.exists():
         raise HTTPException(status_code=404, detail="Audiobook not ready")
 
     media_type = "audio/mpeg" if fmt == "mp3" else "audio/mp4"
-    data = target_path.read_bytes()
-    return Response(
-        content=data,
-        media_type=media_type,
-        headers={"Content-Disposition": f"attachment; filename={target_path.name}"},
+    return _file_response(
+        request, target_path, media_type=media_type, filename=target_path.name
     )
 
 
 @app.get("/jobs/{job_id}/download.txt")
-async def download_book_text(job_id: str) -> Response:
-    job = await db.get_job(settings.db_path, job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    if job.status != "completed" or not job.output_path:
-        raise HTTPException(status_code=400, detail="Job not completed")
-    md_path = Path(job.output_path)
-    if not md_path.exists():
-        raise HTTPException(status_code=404, detail="Output file missing")
-
-    assets = _derive_book_assets(md_path)
+async def download_book_text(
+    request: Request, book: CompletedBook = Depends(get_completed_book)
+) -> Response:
+    _, _, assets = book
     text_path = assets["text"]
     if not text_path.exists():
         raise HTTPException(status_code=404, detail="Text file not ready")
 
-    data = text_path.read_bytes()
-    return Response(
-        content=data,
+    return _file_response(
+        request,
+        text_path,
         media_type="text/plain; charset=utf-8",
-        headers={"Content-Disposition": f"attachment; filename={text_path.name}"},
+        filename=text_path.name,
     )
 
 
 @app.get("/jobs/{job_id}/download.pdf")
-async def download_book_pdf(job_id: str) -> Response:
-    job = await db.get_job(settings.db_path, job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    if job.status != "completed" or not job.output_path:
-        raise HTTPException(status_code=400, detail="Job not completed")
-    md_path = Path(job.output_path)
-    if not md_path.exists():
-        raise HTTPException(status_code=404, detail="Output file missing")
-
+async def download_book_pdf(
+    request: Request, book: CompletedBook = Depends(get_completed_book)
+) -> Response:
+    _, md_path, _ = book
     pdf_name = f"{md_path.stem}.pdf"
     pdf_path = md_path.with_name(pdf_name)
     if not pdf_path.exists():
-        md_text = md_path.read_text(encoding="utf-8")
         try:
-            render_markdown_to_pdf(md_text, pdf_path)
+            await _run_render(_export_book_pdf, md_path, pdf_path)
         except Exception as exc:  # noqa: BLE001
             raise HTTPException(
                 status_code=500, detail=f"PDF export failed: {exc}"
             ) from exc
 
-    data = pdf_path.read_bytes()
-    return Response(
-        content=data,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={pdf_name}"},
+    return _file_response(
+        request, pdf_path, media_type="application/pdf", filename=pdf_name
     )
 
 
@@ -1,35 +1,84 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import io
+import random
 import shutil
-import subprocess
+import threading
+import weakref
 from typing import Any, AsyncIterator, Optional
 
 import httpx
+import orjson
 
 
 class OllamaError(RuntimeError):
     pass
 
 
+_CLIENT_LIMITS = httpx.Limits(
+    max_keepalive_connections=20, max_connections=50, keepalive_expiry=30.0
+)
+# httpx pools are bound to the event loop that opened them, and jobs run on
+# their own loop in a worker thread, so clients are kept per loop and base URL.
+_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]
+] = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def _get_client(base_url: str) -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    key = base_url.rstrip("/")
+    with _clients_lock:
+        per_loop = _clients.setdefault(loop, {})
+        client = per_loop.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=key,
+                timeout=httpx.Timeout(600.0, connect=20.0),
+                limits=_CLIENT_LIMITS,
+            )
+            per_loop[key] = client
+    return client
+
+
+async def close_clients() -> None:
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        per_loop = _clients.pop(loop, {})
+    for client in per_loop.values():
+        await client.aclose()
+
+
+_MAX_RETRIES = 4
+
+
 async def _retry_delay(attempt: int) -> None:
-    delay = min(0.5 * (2**attempt), 5.0)
+    # Jitter keeps concurrent chapter requests from retrying in lock-step
+    # against a restarting Ollama.
+    delay = min(0.5 * (1 << attempt), 5.0)
+    delay *= 0.5 + random.random()
     await asyncio.sleep(delay)
 
 
-def _list_models_cli() -> list[str]:
+async def _list_models_cli() -> list[str]:
     if not shutil.which("ollama"):
         return []
-    result = subprocess.run(
-        ["ollama", "list"],
-        check=False,
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0:
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "ollama",
+            "list",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError:
+        return []
+    stdout, _ = await proc.communicate()
+    if proc.returncode != 0:
         return []
-    lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+    output = stdout.decode("utf-8", errors="replace")
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
     if not lines:
         return []
     header = lines[0].lower()
@@ -48,27 +97,26 @@ async def list_models(
     base_url: str,
     timeout_seconds: float = 10.0,
 ) -> list[str]:
-    url = base_url.rstrip("/") + "/api/tags"
     timeout = httpx.Timeout(timeout_seconds, connect=5.0)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        last_error: Optional[Exception] = None
-        for attempt in range(4):
-            try:
-                resp = await client.get(url)
-                resp.raise_for_status()
-                data = resp.json()
-                break
-            except httpx.HTTPError as e:
-                last_error = e
-                await _retry_delay(attempt)
-            except ValueError as e:  # JSON decode
-                last_error = e
-                await _retry_delay(attempt)
-        else:
-            models = _list_models_cli()
-            if models:
-                return models
-            raise OllamaError(f"Ollama HTTP error: {last_error}") from last_error
+    client = _get_client(base_url)
+    last_error: Optional[Exception] = None
+    for attempt in range(_MAX_RETRIES):
+        try:
+            resp = await client.get("/api/tags", timeout=timeout)
+            resp.raise_for_status()
+            data = resp.json()
+            break
+        except httpx.HTTPError as e:
+            last_error = e
+            await _retry_delay(attempt)
+        except ValueError as e:  # JSON decode
+            last_error = e
+            await _retry_delay(attempt)
+    else:
+        models = await _list_models_cli()
+        if models:
+            return models
+        raise OllamaError(f"Ollama HTTP error: {last_error}") from last_error
 
     models = []
     for item in data.get("models", []):
@@ -76,10 +124,31 @@ async def list_models(
         if name:
             models.append(str(name))
     if not models:
-        models = _list_models_cli()
+        models = await _list_models_cli()
     return models
 
 
+async def _iter_json_lines(resp: httpx.Response) -> AsyncIterator[dict[str, Any]]:
+    # Ollama streams NDJSON; split raw bytes and hand them straight to orjson
+    # instead of decoding every line to str first.
+    buffer = b""
+    async for chunk in resp.aiter_bytes():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+    if buffer.strip():
+        try:
+            yield orjson.loads(buffer)
+        except orjson.JSONDecodeError:
+            pass
+
+
 async def stream_generate(
     *,
     base_url: str,
@@ -89,7 +158,6 @@ async def stream_generate(
     options: Optional[dict[str, Any]] = None,
     timeout_seconds: float = 600.0,
 ) -> AsyncIterator[str]:
-    url = base_url.rstrip("/") + "/api/generate"
     payload: dict[str, Any] = {
         "model": model,
         "prompt": prompt,
@@ -101,31 +169,27 @@ async def stream_generate(
         payload["options"] = options
 
     timeout = httpx.Timeout(timeout_seconds, connect=20.0)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        last_error: Optional[Exception] = None
-        for attempt in range(4):
-            try:
-                async with client.stream("POST", url, json=payload) as resp:
-                    resp.raise_for_status()
-                    async for line in resp.aiter_lines():
-                        if not line:
-                            continue
-                        try:
-                            data = json.loads(line)
-                        except json.JSONDecodeError:
-                            continue
-                        if data.get("error"):
-                            raise OllamaError(str(data["error"]))
-                        chunk = data.get("response")
-                        if chunk:
-                            yield chunk
-                        if data.get("done") is True:
-                            break
-                return
-            except httpx.HTTPError as e:
-                last_error = e
-                await _retry_delay(attempt)
-        raise OllamaError(f"Ollama HTTP error: {last_error}") from last_error
+    client = _get_client(base_url)
+    last_error: Optional[Exception] = None
+    for attempt in range(_MAX_RETRIES):
+        try:
+            async with client.stream(
+                "POST", "/api/generate", json=payload, timeout=timeout
+            ) as resp:
+                resp.raise_for_status()
+                async for data in _iter_json_lines(resp):
+                    if data.get("error"):
+                        raise OllamaError(str(data["error"]))
+                    chunk = data.get("response")
+                    if chunk:
+                        yield chunk
+                    if data.get("done") is True:
+                        break
+            return
+        except httpx.HTTPError as e:
+            last_error = e
+            await _retry_delay(attempt)
+    raise OllamaError(f"Ollama HTTP error: {last_error}") from last_error
 
 
 async def generate_text(
@@ -137,7 +201,7 @@ async def generate_text(
     options: Optional[dict[str, Any]] = None,
     timeout_seconds: float = 600.0,
 ) -> str:
-    parts: list[str] = []
+    buffer = io.StringIO()
     async for chunk in stream_generate(
         base_url=base_url,
         model=model,
@@ -146,8 +210,8 @@ async def generate_text(
         options=options,
         timeout_seconds=timeout_seconds,
     ):
-        parts.append(chunk)
-    return "".join(parts)
+        buffer.write(chunk)
+    return buffer.getvalue()
 
 
 async def ensure_model_available(
@@ -159,17 +223,16 @@ async def ensure_model_available(
     models = await list_models(base_url=base_url)
     if model in models:
         return
-    url = base_url.rstrip("/") + "/api/pull"
     payload = {"name": model, "stream": False}
     timeout = httpx.Timeout(timeout_seconds, connect=20.0)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        last_error: Optional[Exception] = None
-        for attempt in range(4):
-            try:
-                resp = await client.post(url, json=payload)
-                resp.raise_for_status()
-                return
-            except httpx.HTTPError as e:
-                last_error = e
-                await _retry_delay(attempt)
-        raise OllamaError(f"Ollama HTTP error: {last_error}") from last_error
+    client = _get_client(base_url)
+    last_error: Optional[Exception] = None
+    for attempt in range(_MAX_RETRIES):
+        try:
+            resp = await client.post("/api/pull", json=payload, timeout=timeout)
+            resp.raise_for_status()
+            return
+        except httpx.HTTPError as e:
+            last_error = e
+            await _retry_delay(attempt)
+    raise OllamaError(f"Ollama HTTP error: {last_error}") from last_error
@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+import weakref
+from functools import lru_cache
+
 import httpx
 
 
@@ -7,6 +12,44 @@ class OpenAITTSError(RuntimeError):
     pass
 
 
+# One pooled client per event loop; httpx connections can't cross loops.
+_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, httpx.AsyncClient
+] = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def _get_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=60.0,
+                limits=httpx.Limits(
+                    max_keepalive_connections=20,
+                    max_connections=50,
+                    keepalive_expiry=30.0,
+                ),
+            )
+            _clients[loop] = client
+    return client
+
+
+@lru_cache(maxsize=4)
+def _auth_headers(api_key: str) -> dict[str, str]:
+    # httpx copies request headers, so the shared dict is never mutated.
+    return {"Authorization": f"Bearer {api_key}"}
+
+
+async def close_clients() -> None:
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
 async def synthesize_speech(
     *,
     api_key: str,
@@ -24,13 +67,14 @@ async def synthesize_speech(
         "format": format,
         "speed": speed,
     }
-    headers = {"Authorization": f"Bearer {api_key}"}
+    headers = _auth_headers(api_key)
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        try:
-            resp = await client.post(url, json=payload, headers=headers)
-            resp.raise_for_status()
-        except httpx.HTTPError as exc:
-            raise OpenAITTSError(f"OpenAI TTS error: {exc}") from exc
+    client = _get_client()
+    try:
+        resp = await client.post(url, json=payload, headers=headers)
+        resp.raise_for_status()
+    except httpx.HTTPError as exc:
+        raise OpenAITTSError(f"OpenAI TTS error: {exc}") from exc
 
     return resp.content
+
@@ -1,28 +1,60 @@
 from __future__ import annotations
 
+import threading
 from pathlib import Path
+from typing import Callable
 
-
-def render_markdown_to_pdf(markdown_text: str, output_path: Path) -> None:
-    from markdown import markdown  # lazy import
-
-    html_body = markdown(markdown_text, output_format="html5")
-    html = f"""<!doctype html>
+_HTML_PREFIX = """<!doctype html>
 <html>
 <head>
   <meta charset=\"utf-8\" />
   <style>
-    body {{ font-family: Georgia, 'Times New Roman', serif; line-height: 1.6; }}
-    h1, h2, h3 {{ margin-top: 1.2em; }}
-    code, pre {{ font-family: 'Courier New', monospace; }}
-    pre {{ background: #f6f8fa; padding: 12px; border-radius: 6px; }}
+    body { font-family: Georgia, 'Times New Roman', serif; line-height: 1.6; }
+    h1, h2, h3 { margin-top: 1.2em; }
+    code, pre { font-family: 'Courier New', monospace; }
+    pre { background: #f6f8fa; padding: 12px; border-radius: 6px; }
   </style>
 </head>
 <body>
-{html_body}
+"""
+_HTML_SUFFIX = """
 </body>
 </html>"""
 
+# Markdown instances keep parser state, so each render thread gets its own.
+_local = threading.local()
+
+
+def _get_markdown() -> Callable[[str], str]:
+    renderer = getattr(_local, "markdown", None)
+    if renderer is None:
+        try:
+            import mistune  # lazy import
+
+            renderer = mistune.create_markdown(
+                escape=False, plugins=["table", "strikethrough"]
+            )
+        except ImportError:
+            from markdown import Markdown  # lazy import
+            from markdown.inlinepatterns import SimpleTagInlineProcessor
+
+            # Same tables and ~~strikethrough~~ that the mistune plugins give.
+            converter = Markdown(output_format="html5", extensions=["tables"])
+            converter.inlinePatterns.register(
+                SimpleTagInlineProcessor(r"(~~)(.+?)~~", "del"), "del", 175
+            )
+
+            def renderer(text: str) -> str:
+                return converter.reset().convert(text)
+
+        _local.markdown = renderer
+    return renderer
+
+
+def render_markdown_to_pdf(markdown_text: str, output_path: Path) -> None:
+    html_body = _get_markdown()(markdown_text)
+    html = "".join((_HTML_PREFIX, html_body, _HTML_SUFFIX))
+
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     # Prefer weasyprint, fallback to xhtml2pdf for environments without full deps.
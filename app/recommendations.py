@@ -1,21 +1,21 @@
 from __future__ import annotations
 
-import json
+import re
+
+import orjson
 
 from .ollama_client import generate_text
 
 
+# First '[' through last ']'; code fences around the array fall outside it.
+_ARRAY_RE = re.compile(r"\[[\s\S]*\]")
+
+
 def _extract_json_array(text: str) -> list[str]:
-    cleaned = text.strip()
-    if cleaned.startswith("```"):
-        cleaned = cleaned.strip("`")
-        if cleaned.lower().startswith("json"):
-            cleaned = cleaned[4:].strip()
-    start = cleaned.find("[")
-    end = cleaned.rfind("]")
-    if start == -1 or end == -1 or end <= start:
+    match = _ARRAY_RE.search(text)
+    if match is None:
         raise ValueError("Model did not return JSON array")
-    data = json.loads(cleaned[start : end + 1])
+    data = orjson.loads(match.group(0))
     if not isinstance(data, list):
         raise ValueError("JSON response was not a list")
     topics: list[str] = []
@@ -35,13 +35,14 @@ async def recommend_topics_from_recent(
 ) -> list[str]:
     if not recent_jobs:
         return []
+    recent_json = orjson.dumps(recent_jobs)
     recent_topics = [
         item.get("topic", "").strip() for item in recent_jobs if item.get("topic")
     ]
     prompt = (
         "You are helping recommend fresh, high-quality book topics.\n"
         "Use the recent job history as inspiration only.\n\n"
-        f"Recent jobs (topic, status, updated_at): {json.dumps(recent_jobs, ensure_ascii=False)}\n\n"
+        f"Recent jobs (topic, status, updated_at): {recent_json.decode()}\n\n"
         "Return ONLY valid JSON as an array of strings.\n"
         f"Return exactly {limit} items.\n"
         "Do NOT repeat any recent topics.\n"
@@ -57,17 +58,19 @@ async def recommend_topics_from_recent(
     )
     try:
         topics = _extract_json_array(text)
-    except (ValueError, json.JSONDecodeError):
+    except (ValueError, orjson.JSONDecodeError):
         lines = [line.strip("-• \t") for line in text.splitlines() if line.strip()]
         topics = [line for line in lines if line]
     deduped: list[str] = []
-    seen: set[str] = set(t.lower() for t in recent_topics)
+    seen: set[str] = {t.casefold() for t in recent_topics}
+    seen_add = seen.add
+    deduped_append = deduped.append
     for topic in topics:
-        key = topic.lower()
+        key = topic.casefold()
         if key in seen:
             continue
-        seen.add(key)
-        deduped.append(topic)
+        seen_add(key)
+        deduped_append(topic)
         if len(deduped) >= limit:
             break
     return deduped
@@ -27,5 +27,7 @@ class Settings(BaseSettings):
     local_tts_default_voice: str = "p225"
     local_tts_default_speed: float = 1.0
 
+    templates_auto_reload: bool = False
+
 
 settings = Settings()
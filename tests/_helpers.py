@@ -0,0 +1,44 @@
+import sqlite3
+import uuid
+from collections.abc import Iterable
+from contextlib import closing
+from datetime import datetime, timezone
+
+
+def bulk_seed(
+    db_path: str,
+    specs: list[tuple[str, str, float]],
+    *,
+    model: str = "test-model",
+    timestamps: list[str] | None = None,
+) -> list[str]:
+    # specs are (topic, status, progress). Rows go in with their final status
+    # in one executemany and one commit, instead of a create_job plus a
+    # set_job_status transaction per job. timestamps, if given, set each
+    # row's created_at/updated_at; otherwise every row gets "now".
+    now = datetime.now(timezone.utc).isoformat()
+    stamps = timestamps or [now] * len(specs)
+    job_ids = [str(uuid.uuid4()) for _ in specs]
+    rows = [
+        (job_id, topic, model, status, progress, status, position, stamp, stamp)
+        for position, (job_id, (topic, status, progress), stamp) in enumerate(
+            zip(job_ids, specs, stamps, strict=True), start=1
+        )
+    ]
+    with closing(sqlite3.connect(db_path, uri=True)) as conn, conn:
+        conn.executemany(
+            """
+            INSERT INTO jobs (
+                id, topic, model, job_type, status, progress, stage,
+                queue_position, created_at, updated_at
+            )
+            VALUES (?, ?, ?, 'book', ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    return job_ids
+
+
+def assert_all_in(text: str, tokens: Iterable[str]) -> None:
+    missing = [token for token in tokens if token not in text]
+    assert not missing, missing
@@ -0,0 +1,99 @@
+import asyncio
+import shutil
+import sqlite3
+import uuid
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import db
+from app.main import app
+from app.settings import settings
+
+
+@pytest.fixture(scope="session")
+def event_loop() -> Iterator[asyncio.AbstractEventLoop]:
+    # One loop for the whole session; asyncio.run per call rebuilt the loop,
+    # selector and default executor every time.
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.run_until_complete(loop.shutdown_default_executor())
+    loop.close()
+
+
+@pytest.fixture
+def run(event_loop: asyncio.AbstractEventLoop) -> Callable[[Awaitable[Any]], Any]:
+    def _run(coro: Awaitable[Any]) -> Any:
+        return event_loop.run_until_complete(coro)
+
+    return _run
+
+
+@pytest.fixture(scope="session")
+def _schema_template(
+    tmp_path_factory: pytest.TempPathFactory, event_loop: asyncio.AbstractEventLoop
+) -> str:
+    # The schema is built once; each test gets a file copy of it.
+    db_path = str(tmp_path_factory.mktemp("schema") / "schema.db")
+    event_loop.run_until_complete(db.init_db(db_path))
+    return db_path
+
+
+@pytest.fixture
+def file_db_path(tmp_path: Path, _schema_template: str) -> str:
+    db_path = tmp_path / "test.db"
+    shutil.copyfile(_schema_template, db_path)
+    return str(db_path)
+
+
+@pytest.fixture
+def temp_db_path(_schema_template: str) -> Iterator[str]:
+    # Shared-cache in-memory database: no fsync or WAL files. It only exists
+    # while at least one connection is open, so a keeper holds it for the test.
+    db_path = f"file:test_{uuid.uuid4().hex}?mode=memory&cache=shared"
+    keeper = sqlite3.connect(db_path, uri=True)
+    with closing(sqlite3.connect(_schema_template)) as template:
+        template.backup(keeper)
+    yield db_path
+    keeper.close()
+
+
+@pytest.fixture(scope="session")
+def client() -> TestClient:
+    # Not entered as a context manager: startup would initialise the real
+    # data dir and start the job runner against it.
+    return TestClient(app)
+
+
+@pytest.fixture
+def db_path_override(monkeypatch: pytest.MonkeyPatch, temp_db_path: str) -> str:
+    monkeypatch.setattr(settings, "db_path", temp_db_path)
+    return temp_db_path
+
+
+@pytest.fixture
+def completed_book(
+    tmp_path: Path, run: Callable[[Awaitable[Any]], Any], db_path_override: str
+) -> Callable[..., tuple[db.Job, Path]]:
+    def _create(
+        filename: str = "book.md", text: str = "# Title\n\nHello"
+    ) -> tuple[db.Job, Path]:
+        job = run(db.create_job(db_path_override, "Topic 1", "test-model"))
+        md_path = tmp_path / filename
+        md_path.write_text(text, encoding="utf-8")
+        run(
+            db.set_job_status(
+                db_path_override,
+                job.id,
+                status="completed",
+                progress=1.0,
+                output_path=str(md_path),
+            )
+        )
+        return job, md_path
+
+    return _create
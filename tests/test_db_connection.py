@@ -0,0 +1,146 @@
+import asyncio
+import sqlite3
+from contextlib import closing
+
+from app import db
+
+
+def test_shared_connection_does_not_block_job_thread_writes(
+    run, file_db_path: str
+) -> None:
+    # On disk so the WAL locking the server relies on is what gets exercised.
+    db_path = file_db_path
+
+    async def _scenario() -> str:
+        await db.open_shared_connection(db_path)
+        try:
+            job = await db.create_job(db_path, "Topic 1", "test-model")
+            stopped = await db.update_job_status_if(
+                db_path,
+                job.id,
+                from_statuses=("running",),
+                status="stopped",
+                stage="stopped",
+            )
+            assert stopped is False
+            # Jobs write from their own loop on a worker thread.
+            await asyncio.to_thread(
+                asyncio.run,
+                db.set_job_status(db_path, job.id, status="running", progress=0.1),
+            )
+            fetched = await db.get_job(db_path, job.id)
+            assert fetched is not None and fetched.status == "running"
+            return job.id
+        finally:
+            await db.close_shared_connection(db_path)
+
+    job_id = run(_scenario())
+    assert run(db.get_job(db_path, job_id)).status == "running"
+
+
+def test_shared_connection_reads_wait_for_open_write(run, file_db_path: str) -> None:
+    db_path = file_db_path
+
+    async def _scenario() -> list[str]:
+        await db.open_shared_connection(db_path)
+        try:
+            async with db._transaction(db_path) as conn:
+                await conn.execute(
+                    "INSERT INTO app_cache (key, value, updated_at) "
+                    "VALUES ('k', 'v', '')"
+                )
+                read = asyncio.create_task(db.get_cache_entry(db_path, "k"))
+                await asyncio.sleep(0.01)
+                assert not read.done()
+                await conn.execute("DELETE FROM app_cache WHERE key = 'k'")
+            return [await read]
+        finally:
+            await db.close_shared_connection(db_path)
+
+    assert run(_scenario()) == [None]
+
+
+def test_get_job_with_events_and_cache_invalidation(run, temp_db_path: str) -> None:
+    db_path = temp_db_path
+
+    job = run(db.create_job(db_path, "Topic 1", "test-model"))
+    run(db.append_event(db_path, job.id, "info", "First event"))
+
+    fetched, events = run(db.get_job_with_events(db_path, job.id))
+    assert fetched is not None and fetched.status == "queued"
+    assert [e["message"] for e in events] == ["First event"]
+    assert run(db.get_job(db_path, job.id)) is fetched
+
+    run(db.set_job_status(db_path, job.id, status="running", progress=0.5))
+    refreshed = run(db.get_job(db_path, job.id))
+    assert refreshed is not fetched
+    assert refreshed.status == "running"
+
+    assert run(db.get_job_with_events(db_path, "missing")) == (None, [])
+
+
+def test_init_db_migrates_legacy_jobs_table(tmp_path, run) -> None:
+    db_path = str(tmp_path / "legacy.db")
+    with closing(sqlite3.connect(db_path)) as conn, conn:
+        conn.executescript(
+            """
+            CREATE TABLE jobs (
+              id TEXT PRIMARY KEY,
+              topic TEXT NOT NULL,
+              status TEXT NOT NULL,
+              progress REAL NOT NULL,
+              stage TEXT NOT NULL,
+              error TEXT,
+              output_path TEXT,
+              created_at TEXT NOT NULL,
+              updated_at TEXT NOT NULL
+            );
+            INSERT INTO jobs VALUES
+              ('b', 'B', 'queued', 0, 'queued', NULL, NULL, '2026-01-02', '2026-01-02'),
+              ('a', 'A', 'queued', 0, 'queued', NULL, NULL, '2026-01-01', '2026-01-01');
+            """
+        )
+
+    run(db.init_db(db_path))
+    run(db.init_db(db_path))
+
+    assert run(db.list_queued_job_ids(db_path)) == ["a", "b"]
+    job = run(db.get_job(db_path, "a"))
+    assert job.parent_id is None
+    assert run(db.get_cache_entry(db_path, "missing")) is None
+
+
+def test_concurrent_create_job_assigns_distinct_positions(run, file_db_path: str) -> None:
+    async def _create_many() -> list[db.Job]:
+        return await asyncio.gather(
+            *(db.create_job(file_db_path, f"Topic {i}", "test-model") for i in range(5))
+        )
+
+    jobs = run(_create_many())
+
+    assert len({job.id for job in jobs}) == 5
+    with closing(sqlite3.connect(file_db_path)) as conn:
+        positions = [row[0] for row in conn.execute("SELECT queue_position FROM jobs")]
+    assert sorted(positions) == [1, 2, 3, 4, 5]
+
+
+def test_job_cache_evicts_least_recently_used(
+    run, temp_db_path: str, monkeypatch
+) -> None:
+    monkeypatch.setattr(db, "JOB_CACHE_MAXSIZE", 3)
+    monkeypatch.setattr(db, "_job_cache", db.OrderedDict())
+    jobs = [
+        run(db.create_job(temp_db_path, f"Topic {i}", "test-model")) for i in range(4)
+    ]
+
+    for job in jobs[:3]:
+        run(db.get_job(temp_db_path, job.id))
+    # Touch the oldest entry so the second one becomes least recently used.
+    run(db.get_job(temp_db_path, jobs[0].id))
+    run(db.get_job(temp_db_path, jobs[3].id))
+
+    assert list(db._job_cache) == [
+        (temp_db_path, jobs[2].id),
+        (temp_db_path, jobs[0].id),
+        (temp_db_path, jobs[3].id),
+    ]
@@ -0,0 +1,63 @@
+import time
+
+from starlette.requests import Request
+
+from app.main import _is_not_modified
+
+
+def test_download_supports_conditional_get(completed_book, client) -> None:
+    job, _ = completed_book()
+
+    response = client.get(f"/jobs/{job.id}/download")
+    assert response.status_code == 200
+    assert response.content == b"# Title\n\nHello"
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+    assert etag.startswith('W/"')
+
+    response = client.get(
+        f"/jobs/{job.id}/download", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = client.get(
+        f"/jobs/{job.id}/download", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+
+    response = client.get(
+        f"/jobs/{job.id}/download", headers={"If-None-Match": 'W/"stale"'}
+    )
+    assert response.status_code == 200
+
+
+def test_markdown_download_is_gzipped_but_pdf_is_not(completed_book, client) -> None:
+    body = "# Title\n\n" + "A long paragraph of book text.\n" * 200
+    job, md_path = completed_book(text=body)
+    md_path.with_suffix(".pdf").write_bytes(b"%PDF-1.4\n" + b"0" * 4096)
+
+    headers = {"Accept-Encoding": "gzip"}
+    response = client.get(f"/jobs/{job.id}/download", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == body
+
+    response = client.get(f"/jobs/{job.id}/download.pdf", headers=headers)
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+def test_if_modified_since_without_zone_is_read_as_utc(monkeypatch) -> None:
+    # A naive parse must not shift by the host's UTC offset.
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    since = b"Sun, 01 Feb 2026 12:00:00 -0000"
+    try:
+        request = Request({"type": "http", "headers": [(b"if-modified-since", since)]})
+        utc_noon = 1769947200.0
+        assert _is_not_modified(request, 'W/"x"', utc_noon)
+        assert not _is_not_modified(request, 'W/"x"', utc_noon + 60)
+    finally:
+        monkeypatch.undo()
+        time.tzset()
@@ -0,0 +1,5 @@
+def test_index_page_is_gzipped(db_path_override, client) -> None:
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Queue progress" in response.text
@@ -0,0 +1,26 @@
+from app import db, main
+
+
+def test_job_stream_returns_tail_after_id(run, db_path_override) -> None:
+    db_path = db_path_override
+
+    job = run(db.create_job(db_path, "Topic 1", "test-model"))
+    run(db.append_event(db_path, job.id, "info", "First event"))
+    run(db.append_event(db_path, job.id, "info", "Second event"))
+
+    frames, last_id = run(main._render_job_stream(job.id, 0))
+    assert "First event" in frames["events"]
+    assert "Second event" in frames["events"]
+    assert "status" in frames
+    assert 'id="job-events-empty" hx-swap-oob="true"' in frames["events"]
+
+    run(db.append_event(db_path, job.id, "info", "Third event"))
+
+    frames, next_id = run(main._render_job_stream(job.id, last_id))
+    assert "Third event" in frames["events"]
+    assert "Second event" not in frames["events"]
+    assert "job-events-empty" not in frames["events"]
+    assert next_id > last_id
+
+    frames, _ = run(main._render_job_stream(job.id, next_id))
+    assert "events" not in frames
@@ -0,0 +1,122 @@
+import asyncio
+
+from app import db
+from app.main import JobRunner
+from app.settings import settings
+
+
+def test_runner_picks_up_jobs_queued_before_start(
+    monkeypatch, run, temp_db_path: str
+) -> None:
+    db_path = temp_db_path
+
+    first = run(db.create_job(db_path, "Topic 1", "test-model"))
+    cancelled = run(db.create_job(db_path, "Topic 2", "test-model"))
+    second = run(db.create_job(db_path, "Topic 3", "test-model"))
+    run(db.set_job_status(db_path, cancelled.id, status="cancelled"))
+
+    assert run(db.list_queued_job_ids(db_path)) == [first.id, second.id]
+
+    ran: list[str] = []
+
+    async def _fake_background(**kwargs: object) -> None:
+        job = kwargs["job"]
+        ran.append(job.id)
+        await db.set_job_status(db_path, job.id, status="completed", progress=1.0)
+
+    monkeypatch.setattr(settings, "db_path", db_path)
+    monkeypatch.setattr("app.main._run_job_background", _fake_background)
+
+    async def _scenario() -> None:
+        runner = JobRunner()
+        await runner.start()
+        for _ in range(100):
+            if len(ran) == 2:
+                break
+            await asyncio.sleep(0.01)
+        await runner.stop()
+
+    run(_scenario())
+
+    assert ran == [first.id, second.id]
+
+
+def test_runner_dispatches_enqueued_job_and_stops_when_idle(
+    monkeypatch, run, temp_db_path: str
+) -> None:
+    db_path = temp_db_path
+
+    ran: list[str] = []
+
+    async def _fake_background(**kwargs: object) -> None:
+        job = kwargs["job"]
+        ran.append(job.id)
+        await db.set_job_status(db_path, job.id, status="completed", progress=1.0)
+
+    monkeypatch.setattr(settings, "db_path", db_path)
+    monkeypatch.setattr("app.main._run_job_background", _fake_background)
+
+    async def _scenario() -> str:
+        runner = JobRunner()
+        await runner.start()
+        job = await db.create_job(db_path, "Topic 1", "test-model")
+        await runner.enqueue(job.id)
+        for _ in range(100):
+            if ran:
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.wait_for(runner.stop(), timeout=1.0)
+        return job.id
+
+    job_id = run(_scenario())
+
+    assert ran == [job_id]
+
+
+def test_idle_runner_exits_on_stop_sentinel(
+    monkeypatch, run, temp_db_path: str
+) -> None:
+    db_path = temp_db_path
+    monkeypatch.setattr(settings, "db_path", db_path)
+
+    async def _scenario() -> asyncio.Task[None]:
+        runner = JobRunner()
+        await runner.start()
+        await asyncio.sleep(0)
+        task = runner._task
+        await runner.stop()
+        assert runner.queue.empty()
+        return task
+
+    task = run(_scenario())
+
+    assert task.done()
+    assert not task.cancelled()
+
+
+def test_subscribers_only_wake_for_their_own_job(
+    monkeypatch, run, temp_db_path: str
+) -> None:
+    db_path = temp_db_path
+    first = run(db.create_job(db_path, "Topic 1", "test-model"))
+    second = run(db.create_job(db_path, "Topic 2", "test-model"))
+    run(db.set_job_status(db_path, first.id, status="stopped"))
+    run(db.set_job_status(db_path, second.id, status="stopped"))
+    monkeypatch.setattr(settings, "db_path", db_path)
+
+    async def _scenario() -> tuple[int, int]:
+        runner = JobRunner()
+        await runner.start()
+        first_changes = runner.subscribe(first.id)
+        second_changes = runner.subscribe(second.id)
+        await db.append_event(db_path, first.id, "info", "One")
+        await db.append_event(db_path, first.id, "info", "Two")
+        await asyncio.sleep(0.05)
+        sizes = (first_changes.qsize(), second_changes.qsize())
+        runner.unsubscribe(first.id, first_changes)
+        runner.unsubscribe(second.id, second_changes)
+        assert runner._subscribers == {}
+        await runner.stop()
+        return sizes
+
+    assert run(_scenario()) == (1, 0)
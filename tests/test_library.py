@@ -1,41 +1,9 @@
-import asyncio
-from pathlib import Path
+from _helpers import assert_all_in
 
-from fastapi.testclient import TestClient
 
-from app import db
-from app.main import app
-from app.settings import settings
+def test_library_lists_completed_jobs(completed_book, client) -> None:
+    completed_book(text="# Real Analysis\n\nIntro text.")
 
-
-def _run(coro):
-    return asyncio.run(coro)
-
-
-def test_library_lists_completed_jobs(tmp_path: Path) -> None:
-    db_path = str(tmp_path / "test.db")
-    _run(db.init_db(db_path))
-
-    job = _run(db.create_job(db_path, "Topic 1", "test-model"))
-    book_path = tmp_path / "book.md"
-    book_path.write_text("# Real Analysis\n\nIntro text.", encoding="utf-8")
-    _run(
-        db.set_job_status(
-            db_path,
-            job.id,
-            status="completed",
-            progress=1.0,
-            output_path=str(book_path),
-        )
-    )
-
-    original_db_path = settings.db_path
-    try:
-        settings.db_path = db_path
-        client = TestClient(app)
-        response = client.get("/library", follow_redirects=True)
-        assert response.status_code == 200
-        assert "Library" in response.text
-        assert "Real Analysis" in response.text
-    finally:
-        settings.db_path = original_db_path
+    response = client.get("/library", follow_redirects=True)
+    assert response.status_code == 200
+    assert_all_in(response.text, ["Library", "Real Analysis"])
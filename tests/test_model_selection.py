@@ -1,19 +1,45 @@
-import asyncio
-from pathlib import Path
-
 from app import db
 
 
-def _run(coro):
-    return asyncio.run(coro)
-
-
-def test_create_job_stores_model(tmp_path: Path) -> None:
-    db_path = str(tmp_path / "test.db")
-    _run(db.init_db(db_path))
+def test_create_job_stores_model(run, temp_db_path: str) -> None:
+    db_path = temp_db_path
 
-    job = _run(db.create_job(db_path, "Topic 1", "model-x"))
-    fetched = _run(db.get_job(db_path, job.id))
+    job = run(db.create_job(db_path, "Topic 1", "model-x"))
+    fetched = run(db.get_job(db_path, job.id))
 
     assert fetched is not None
     assert fetched.model == "model-x"
+
+
+def test_cached_models_refreshes_in_background(monkeypatch, run) -> None:
+    from app import main
+    from app.settings import settings
+
+    calls: list[str] = []
+
+    async def _fake_list_models(*, base_url: str, timeout_seconds: float) -> list[str]:
+        calls.append(base_url)
+        return ["llama3"]
+
+    monkeypatch.setattr(main, "list_models", _fake_list_models)
+    monkeypatch.setattr(settings, "ollama_model", "default-model")
+    monkeypatch.setattr(
+        main,
+        "_models_cache",
+        {"value": [], "updated_at": 0.0, "in_flight": False},
+    )
+
+    async def _scenario() -> tuple[list[str], list[str], list[str]]:
+        stale = main._cached_models()
+        await main._models_cache["task"]
+        fresh = main._cached_models()
+        again = main._cached_models()
+        return stale, fresh, again
+
+    stale, fresh, again = run(_scenario())
+
+    assert stale == ["default-model"]
+    assert fresh == ["llama3", "default-model"]
+    assert again == fresh
+    assert main._models_cache["value"] == ["llama3"]
+    assert len(calls) == 1
@@ -0,0 +1,87 @@
+import asyncio
+import os
+
+import httpx
+
+from app import ollama_client
+
+
+def test_clients_are_reused_per_base_url_and_closed(run) -> None:
+    async def _scenario() -> None:
+        first = ollama_client._get_client("http://ollama:11434/")
+        second = ollama_client._get_client("http://ollama:11434")
+        other = ollama_client._get_client("http://other:11434")
+        assert first is second
+        assert first is not other
+
+        await ollama_client.close_clients()
+        assert first.is_closed and other.is_closed
+        assert ollama_client._get_client("http://ollama:11434") is not first
+        await ollama_client.close_clients()
+
+    run(_scenario())
+
+
+def test_each_event_loop_gets_its_own_client() -> None:
+    async def _get() -> object:
+        return ollama_client._get_client("http://ollama:11434")
+
+    loop_a = asyncio.new_event_loop()
+    loop_b = asyncio.new_event_loop()
+    try:
+        client_a = loop_a.run_until_complete(_get())
+        client_b = loop_b.run_until_complete(_get())
+        assert client_a is not client_b
+        loop_a.run_until_complete(ollama_client.close_clients())
+        loop_b.run_until_complete(ollama_client.close_clients())
+    finally:
+        loop_a.close()
+        loop_b.close()
+
+
+def test_generate_text_parses_split_ndjson_stream(run, monkeypatch) -> None:
+    frames = (
+        b'{"response": "Hel"}\n{"resp'
+        b'onse": "lo"}\nnot json\n\n{"response": "!", "done": true}'
+    )
+
+    async def _body():
+        for start in range(0, len(frames), 7):
+            yield frames[start : start + 7]
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/api/generate"
+        return httpx.Response(200, content=_body())
+
+    def _mock_client(base_url: str) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url, transport=httpx.MockTransport(_handler)
+        )
+
+    monkeypatch.setattr(ollama_client, "_get_client", _mock_client)
+
+    text = run(
+        ollama_client.generate_text(
+            base_url="http://ollama:11434", model="m", prompt="Say hello"
+        )
+    )
+
+    assert text == "Hello!"
+
+
+def test_list_models_cli_parses_ollama_list_output(
+    run, tmp_path, monkeypatch
+) -> None:
+    script = tmp_path / "ollama"
+    script.write_text(
+        "#!/bin/sh\n"
+        "echo 'NAME            ID      SIZE   MODIFIED'\n"
+        "echo 'llama3:latest   abc123  4.7 GB 2 days ago'\n"
+        "echo 'mistral:7b      def456  4.1 GB 5 days ago'\n"
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}:{os.environ.get('PATH', '')}")
+
+    models = run(ollama_client._list_models_cli())
+
+    assert models == ["llama3:latest", "mistral:7b"]
@@ -1,47 +1,59 @@
-import asyncio
+import sys
+import threading
+import types
 from pathlib import Path
 
-from fastapi.testclient import TestClient
 
-from app import db
-from app.main import app
-from app.settings import settings
+def test_pdf_download_generates_file(monkeypatch, completed_book, client) -> None:
+    job, _ = completed_book("My Book.md", "# Test\n\nHello")
 
+    def _fake_render(md_text: str, output_path: Path) -> None:
+        output_path.write_bytes(b"%PDF-1.4\n%fake")
 
-def _run(coro):
-    return asyncio.run(coro)
+    monkeypatch.setattr("app.main.render_markdown_to_pdf", _fake_render)
 
+    response = client.get(f"/jobs/{job.id}/download.pdf")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/pdf")
+    assert response.content.startswith(b"%PDF")
+    assert 'filename="My Book.pdf"' in response.headers.get("content-disposition", "")
 
-def test_pdf_download_generates_file(tmp_path: Path, monkeypatch) -> None:
-    db_path = str(tmp_path / "test.db")
-    _run(db.init_db(db_path))
 
-    job = _run(db.create_job(db_path, "Topic 1", "test-model"))
-    md_path = tmp_path / "My Book.md"
-    md_path.write_text("# Test\n\nHello", encoding="utf-8")
-    _run(
-        db.set_job_status(
-            db_path,
-            job.id,
-            status="completed",
-            progress=1.0,
-            output_path=str(md_path),
-        )
-    )
+TABLE_AND_STRIKE_MD = "| A | B |\n|---|---|\n| 1 | 2 |\n\nSome ~~old~~ text."
 
-    def _fake_render(md_text: str, output_path: Path) -> None:
-        output_path.write_bytes(b"%PDF-1.4\n%fake")
 
-    monkeypatch.setattr("app.pdf_export.render_markdown_to_pdf", _fake_render)
-
-    original_db_path = settings.db_path
-    try:
-        settings.db_path = db_path
-        client = TestClient(app)
-        response = client.get(f"/jobs/{job.id}/download.pdf")
-        assert response.status_code == 200
-        assert response.headers["content-type"].startswith("application/pdf")
-        assert response.content.startswith(b"%PDF")
-        assert "filename=My Book.pdf" in response.headers.get("content-disposition", "")
-    finally:
-        settings.db_path = original_db_path
+def test_markdown_renderer_uses_mistune_plugins(monkeypatch) -> None:
+    from app import pdf_export
+
+    calls = []
+
+    def _create_markdown(**kwargs):
+        calls.append(kwargs)
+        return lambda text: "<table></table><p><del>old</del></p>"
+
+    fake_mistune = types.ModuleType("mistune")
+    fake_mistune.create_markdown = _create_markdown
+    monkeypatch.setitem(sys.modules, "mistune", fake_mistune)
+    monkeypatch.setattr(pdf_export, "_local", threading.local())
+
+    html = pdf_export._get_markdown()(TABLE_AND_STRIKE_MD)
+    assert calls == [{"escape": False, "plugins": ["table", "strikethrough"]}]
+    assert "<table>" in html
+    assert "<del>old</del>" in html
+
+
+def test_markdown_renderer_falls_back_without_mistune(monkeypatch) -> None:
+    from app import pdf_export
+
+    monkeypatch.setitem(sys.modules, "mistune", None)
+    monkeypatch.setattr(pdf_export, "_local", threading.local())
+
+    render = pdf_export._get_markdown()
+    html = render("# Title\n\nSome *emphasis*.")
+    assert "<h1>Title</h1>" in html
+    assert "<em>emphasis</em>" in html
+
+    html = render(TABLE_AND_STRIKE_MD)
+    assert "<table>" in html
+    assert "<td>1</td>" in html
+    assert "<del>old</del>" in html
@@ -1,117 +1,62 @@
-import asyncio
+import sqlite3
+from contextlib import closing
 from datetime import datetime, timedelta, timezone
 
-import aiosqlite
-
 from app import db
 
-
-def _run(coro):
-    return asyncio.run(coro)
-
-
-async def _insert_job(
-    *,
-    db_path: str,
-    job_id: str,
-    topic: str,
-    status: str,
-    progress: float,
-    stage: str,
-    created_at: str,
-    updated_at: str,
-    output_path: str | None = None,
-) -> None:
-    async with aiosqlite.connect(db_path) as conn:
-        await conn.execute(
+NOW = datetime(2026, 2, 3, 12, 0, 0, tzinfo=timezone.utc)
+_NOW_ISO = NOW.isoformat()
+
+# Timestamps are built once at import; the test passes NOW to get_queue_stats
+# so the running job's elapsed time doesn't depend on the wall clock.
+ROWS = [
+    (
+        "completed-1",
+        "Done",
+        "completed",
+        1.0,
+        "completed",
+        None,
+        "book.md",
+        (NOW - timedelta(minutes=40)).isoformat(),
+        (NOW - timedelta(minutes=20)).isoformat(),
+    ),
+    (
+        "running-1",
+        "Running",
+        "running",
+        0.5,
+        "outline",
+        None,
+        None,
+        (NOW - timedelta(minutes=10)).isoformat(),
+        _NOW_ISO,
+    ),
+    ("queued-1", "Queued 1", "queued", 0.0, "queued", None, None, _NOW_ISO, _NOW_ISO),
+    ("queued-2", "Queued 2", "queued", 0.0, "queued", None, None, _NOW_ISO, _NOW_ISO),
+]
+
+
+def _insert_jobs(db_path: str, rows: list[tuple]) -> None:
+    with closing(sqlite3.connect(db_path, uri=True)) as conn, conn:
+        conn.executemany(
             """
             INSERT INTO jobs (id, topic, status, progress, stage, error, output_path, created_at, updated_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (
-                job_id,
-                topic,
-                status,
-                progress,
-                stage,
-                None,
-                output_path,
-                created_at,
-                updated_at,
-            ),
+            rows,
         )
-        await conn.commit()
-
-
-def test_queue_eta_calculation(tmp_path):
-    db_path = str(tmp_path / "test.db")
-    _run(db.init_db(db_path))
 
-    now = datetime.now(timezone.utc)
 
-    completed_created = (now - timedelta(minutes=40)).isoformat()
-    completed_updated = (now - timedelta(minutes=20)).isoformat()
-
-    running_created = (now - timedelta(minutes=10)).isoformat()
-    running_updated = now.isoformat()
-
-    _run(
-        _insert_job(
-            db_path=db_path,
-            job_id="completed-1",
-            topic="Done",
-            status="completed",
-            progress=1.0,
-            stage="completed",
-            created_at=completed_created,
-            updated_at=completed_updated,
-            output_path=str(tmp_path / "book.md"),
-        )
-    )
-    _run(
-        _insert_job(
-            db_path=db_path,
-            job_id="running-1",
-            topic="Running",
-            status="running",
-            progress=0.5,
-            stage="outline",
-            created_at=running_created,
-            updated_at=running_updated,
-        )
-    )
-    _run(
-        _insert_job(
-            db_path=db_path,
-            job_id="queued-1",
-            topic="Queued 1",
-            status="queued",
-            progress=0.0,
-            stage="queued",
-            created_at=now.isoformat(),
-            updated_at=now.isoformat(),
-        )
-    )
-    _run(
-        _insert_job(
-            db_path=db_path,
-            job_id="queued-2",
-            topic="Queued 2",
-            status="queued",
-            progress=0.0,
-            stage="queued",
-            created_at=now.isoformat(),
-            updated_at=now.isoformat(),
-        )
-    )
+def test_queue_eta_calculation(temp_db_path, run):
+    _insert_jobs(temp_db_path, ROWS)
 
-    stats = _run(db.get_queue_stats(db_path))
+    stats = run(db.get_queue_stats(temp_db_path, now=NOW))
 
     assert stats["total"] == 4
     assert stats["queued"] == 2
     assert stats["running"] == 1
     assert stats["completed"] == 1
-    expected_total_eta = 3000
-    assert stats["total_eta_seconds"] is not None
-    assert abs(int(stats["total_eta_seconds"]) - expected_total_eta) <= 5
+    # 10m left on the running job plus two queued jobs at the 20m average.
+    assert stats["total_eta_seconds"] == 3000
     assert stats["total_eta_text"] == "50m"
@@ -1,34 +1,28 @@
 """Tests for expandable queue display with parent-child job relationships."""
 
 import asyncio
-from pathlib import Path
 
-import pytest
-from fastapi.testclient import TestClient
+from _helpers import assert_all_in
 
 from app import db
-from app.main import app
 from app.settings import settings
 
 
-def _run(coro):
-    return asyncio.run(coro)
+async def _gather(*coros):
+    # gather() has to be created inside the running loop, not handed to run().
+    return await asyncio.gather(*coros)
 
 
-@pytest.fixture()
-def temp_db_path(tmp_path: Path) -> str:
-    return str(tmp_path / "test.db")
-
-
-def test_queue_displays_parent_and_child_jobs(temp_db_path: str) -> None:
+def test_queue_displays_parent_and_child_jobs(
+    temp_db_path: str, run, db_path_override, client
+) -> None:
     """Test that parent jobs (books) and child jobs (subtasks) display correctly in queue."""
-    _run(db.init_db(temp_db_path))
 
     # Create a parent job (book)
-    parent = _run(db.create_job(temp_db_path, "Advanced Physics", "test-model"))
+    parent = run(db.create_job(temp_db_path, "Advanced Physics", "test-model"))
 
     # Create child jobs (subtasks: text, mp3, m4b)
-    child_text = _run(
+    child_text = run(
         db.create_job(
             temp_db_path,
             "PDF export: Advanced Physics",
@@ -37,7 +31,7 @@ def test_queue_displays_parent_and_child_jobs(temp_db_path: str) -> None:
             parent_id=parent.id,
         )
     )
-    child_mp3 = _run(
+    child_mp3 = run(
         db.create_job(
             temp_db_path,
             "Audio: Advanced Physics",
@@ -47,37 +41,23 @@ def test_queue_displays_parent_and_child_jobs(temp_db_path: str) -> None:
         )
     )
 
-    original_db_path = settings.db_path
-    try:
-        settings.db_path = temp_db_path
-        client = TestClient(app)
-
-        # Fetch the index page
-        response = client.get("/")
-        assert response.status_code == 200
-        html = response.text
+    # Fetch the index page
+    response = client.get("/")
+    assert response.status_code == 200
+    html = response.text
 
-        # Verify parent job appears
-        assert parent.topic in html
-        assert parent.id in html
+    # Verify parent and child jobs appear
+    assert_all_in(html, [parent.topic, parent.id, child_text.topic, child_mp3.topic])
 
-        # Verify child jobs appear
-        assert child_text.topic in html
-        assert child_mp3.topic in html
 
-    finally:
-        settings.db_path = original_db_path
-
-
-def test_list_child_jobs_for_parents(temp_db_path: str) -> None:
+def test_list_child_jobs_for_parents(temp_db_path: str, run) -> None:
     """Test that list_child_jobs_for_parents correctly retrieves child jobs."""
-    _run(db.init_db(temp_db_path))
 
     # Create parent job
-    parent = _run(db.create_job(temp_db_path, "Data Science", "test-model"))
+    parent = run(db.create_job(temp_db_path, "Data Science", "test-model"))
 
     # Create multiple child jobs
-    child1 = _run(
+    child1 = run(
         db.create_job(
             temp_db_path,
             "PDF: Data Science",
@@ -86,7 +66,7 @@ def test_list_child_jobs_for_parents(temp_db_path: str) -> None:
             parent_id=parent.id,
         )
     )
-    child2 = _run(
+    child2 = run(
         db.create_job(
             temp_db_path,
             "MP3: Data Science",
@@ -97,8 +77,8 @@ def test_list_child_jobs_for_parents(temp_db_path: str) -> None:
     )
 
     # Create another parent job with its own children
-    parent2 = _run(db.create_job(temp_db_path, "Machine Learning", "test-model"))
-    child3 = _run(
+    parent2 = run(db.create_job(temp_db_path, "Machine Learning", "test-model"))
+    child3 = run(
         db.create_job(
             temp_db_path,
             "PDF: ML",
@@ -109,7 +89,7 @@ def test_list_child_jobs_for_parents(temp_db_path: str) -> None:
     )
 
     # Fetch child map
-    child_map = _run(
+    child_map = run(
         db.list_child_jobs_for_parents(temp_db_path, [parent.id, parent2.id])
     )
 
@@ -126,15 +106,16 @@ def test_list_child_jobs_for_parents(temp_db_path: str) -> None:
     assert child3.id in parent2_children
 
 
-def test_child_jobs_cannot_be_reordered_directly(temp_db_path: str) -> None:
+def test_child_jobs_cannot_be_reordered_directly(
+    temp_db_path: str, run, db_path_override, client
+) -> None:
     """Test that only parent jobs can be moved in queue, not child jobs."""
-    _run(db.init_db(temp_db_path))
 
     # Create parent job
-    parent = _run(db.create_job(temp_db_path, "History", "test-model"))
+    parent = run(db.create_job(temp_db_path, "History", "test-model"))
 
     # Create child job (subtask)
-    child = _run(
+    child = run(
         db.create_job(
             temp_db_path,
             "PDF: History",
@@ -145,78 +126,70 @@ def test_child_jobs_cannot_be_reordered_directly(temp_db_path: str) -> None:
     )
 
     # Set both to queued status
-    _run(db.set_job_status(temp_db_path, parent.id, status="queued", progress=0.0))
-    _run(db.set_job_status(temp_db_path, child.id, status="queued", progress=0.0))
-
-    original_db_path = settings.db_path
-    try:
-        settings.db_path = temp_db_path
-        client = TestClient(app)
-
-        # Try to move child job (should work but isn't recommended)
-        # The UI doesn't show move buttons for child jobs, but the endpoint should still work
-        response = client.post(
-            f"/jobs/{child.id}/move",
-            data={"direction": "up"},
-            follow_redirects=False,
-        )
-        # The endpoint works but the UI doesn't expose it for child jobs
-        assert response.status_code in [303, 404]  # Redirect on success or 404 if not found
-
-    finally:
-        settings.db_path = original_db_path
+    run(db.set_job_status(temp_db_path, parent.id, status="queued", progress=0.0))
+    run(db.set_job_status(temp_db_path, child.id, status="queued", progress=0.0))
+
+    # Try to move child job (should work but isn't recommended)
+    # The UI doesn't show move buttons for child jobs, but the endpoint should still work
+    response = client.post(
+        f"/jobs/{child.id}/move",
+        data={"direction": "up"},
+        follow_redirects=False,
+    )
+    # The endpoint works but the UI doesn't expose it for child jobs
+    assert response.status_code in [303, 404]  # Redirect on success or 404 if not found
 
 
-def test_parent_job_movement_preserves_child_jobs(temp_db_path: str) -> None:
+def test_parent_job_movement_preserves_child_jobs(
+    file_db_path: str, run, monkeypatch, client
+) -> None:
     """Test that moving a parent job doesn't affect its child jobs."""
-    _run(db.init_db(temp_db_path))
-
-    # Create two parent jobs with children
-    parent1 = _run(db.create_job(temp_db_path, "Topic A", "test-model"))
-    parent2 = _run(db.create_job(temp_db_path, "Topic B", "test-model"))
-
-    child1 = _run(
-        db.create_job(
-            temp_db_path,
-            "PDF: Topic A",
-            "test-model",
-            job_type="pdf",
-            parent_id=parent1.id,
+    # Setup writes run concurrently, which needs a file-backed database:
+    # shared-cache memory databases fail instead of waiting on table locks.
+    db_path = file_db_path
+    monkeypatch.setattr(settings, "db_path", db_path)
+
+    # Independent setup steps go through one gather per dependency level
+    parent1, parent2 = run(
+        _gather(
+            db.create_job(db_path, "Topic A", "test-model"),
+            db.create_job(db_path, "Topic B", "test-model"),
         )
     )
-    child2 = _run(
-        db.create_job(
-            temp_db_path,
-            "PDF: Topic B",
-            "test-model",
-            job_type="pdf",
-            parent_id=parent2.id,
+    run(
+        _gather(
+            *(
+                db.create_job(
+                    db_path,
+                    f"PDF: {parent.topic}",
+                    "test-model",
+                    job_type="pdf",
+                    parent_id=parent.id,
+                )
+                for parent in (parent1, parent2)
+            )
         )
     )
 
     # Set both parents to queued status
-    _run(db.set_job_status(temp_db_path, parent1.id, status="queued", progress=0.0))
-    _run(db.set_job_status(temp_db_path, parent2.id, status="queued", progress=0.0))
-
-    original_db_path = settings.db_path
-    try:
-        settings.db_path = temp_db_path
-        client = TestClient(app)
-
-        # Move parent2 up
-        response = client.post(
-            f"/jobs/{parent2.id}/move",
-            data={"direction": "up"},
-            follow_redirects=False,
+    run(
+        _gather(
+            db.set_job_status(db_path, parent1.id, status="queued", progress=0.0),
+            db.set_job_status(db_path, parent2.id, status="queued", progress=0.0),
         )
-        assert response.status_code == 303
+    )
 
-        # Verify child jobs still exist and are associated
-        child_map = _run(
-            db.list_child_jobs_for_parents(temp_db_path, [parent1.id, parent2.id])
-        )
-        assert len(child_map[parent1.id]) == 1
-        assert len(child_map[parent2.id]) == 1
+    # Move parent2 up
+    response = client.post(
+        f"/jobs/{parent2.id}/move",
+        data={"direction": "up"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303
 
-    finally:
-        settings.db_path = original_db_path
+    # Verify child jobs still exist and are associated
+    child_map = run(
+        db.list_child_jobs_for_parents(db_path, [parent1.id, parent2.id])
+    )
+    assert len(child_map[parent1.id]) == 1
+    assert len(child_map[parent2.id]) == 1
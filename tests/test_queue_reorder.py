@@ -1,92 +1,45 @@
-import asyncio
-from pathlib import Path
+import sqlite3
+from contextlib import closing
 
-import aiosqlite
-from fastapi.testclient import TestClient
 
-from app import db
-from app.main import app
-from app.settings import settings
-
-
-def _run(coro):
-    return asyncio.run(coro)
-
-
-async def _insert_job(
-    *,
-    db_path: str,
-    job_id: str,
-    topic: str,
-    status: str,
-    progress: float,
-    stage: str,
-    queue_position: int,
-) -> None:
-    async with aiosqlite.connect(db_path) as conn:
-        await conn.execute(
+def _insert_jobs(db_path: str, rows: list[tuple]) -> None:
+    with closing(sqlite3.connect(db_path, uri=True)) as conn, conn:
+        conn.executemany(
             """
             INSERT INTO jobs (id, topic, status, progress, stage, error, output_path, queue_position, created_at, updated_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))
             """,
-            (job_id, topic, status, progress, stage, None, None, queue_position),
+            rows,
         )
-        await conn.commit()
 
 
-def test_move_job_up_down(tmp_path: Path) -> None:
-    db_path = str(tmp_path / "test.db")
-    _run(db.init_db(db_path))
+def test_move_job_up_down(db_path_override, client) -> None:
+    db_path = db_path_override
 
-    _run(
-        _insert_job(
-            db_path=db_path,
-            job_id="job-1",
-            topic="A",
-            status="queued",
-            progress=0.0,
-            stage="queued",
-            queue_position=1,
-        )
-    )
-    _run(
-        _insert_job(
-            db_path=db_path,
-            job_id="job-2",
-            topic="B",
-            status="queued",
-            progress=0.0,
-            stage="queued",
-            queue_position=2,
-        )
-    )
-
-    original_db_path = settings.db_path
-    try:
-        settings.db_path = db_path
-        client = TestClient(app)
+    rows = [
+        ("job-1", "A", "queued", 0.0, "queued", None, None, 1),
+        ("job-2", "B", "queued", 0.0, "queued", None, None, 2),
+    ]
+    _insert_jobs(db_path, rows)
 
-        response = client.post(
-            "/jobs/job-2/move", data={"direction": "up"}, follow_redirects=False
-        )
-        assert response.status_code == 303
+    response = client.post(
+        "/jobs/job-2/move", data={"direction": "up"}, follow_redirects=False
+    )
+    assert response.status_code == 303
 
-        async def _positions():
-            async with aiosqlite.connect(db_path) as conn:
-                async with conn.execute(
-                    "SELECT id, queue_position FROM jobs ORDER BY queue_position ASC"
-                ) as cur:
-                    return await cur.fetchall()
+    def _positions():
+        with closing(sqlite3.connect(db_path, uri=True)) as conn:
+            return conn.execute(
+                "SELECT id, queue_position FROM jobs ORDER BY queue_position ASC"
+            ).fetchall()
 
-        rows = _run(_positions())
-        assert [row[0] for row in rows] == ["job-2", "job-1"]
+    rows = _positions()
+    assert [row[0] for row in rows] == ["job-2", "job-1"]
 
-        response = client.post(
-            "/jobs/job-2/move", data={"direction": "down"}, follow_redirects=False
-        )
-        assert response.status_code == 303
+    response = client.post(
+        "/jobs/job-2/move", data={"direction": "down"}, follow_redirects=False
+    )
+    assert response.status_code == 303
 
-        rows = _run(_positions())
-        assert [row[0] for row in rows] == ["job-1", "job-2"]
-    finally:
-        settings.db_path = original_db_path
+    rows = _positions()
+    assert [row[0] for row in rows] == ["job-1", "job-2"]
@@ -1,31 +0,0 @@
-import asyncio
-from pathlib import Path
-
-from fastapi.testclient import TestClient
-
-from app import db
-from app.main import app
-from app.settings import settings
-
-
-def _run(coro):
-    return asyncio.run(coro)
-
-
-def test_queue_status_partial_renders(tmp_path: Path) -> None:
-    db_path = str(tmp_path / "test.db")
-    _run(db.init_db(db_path))
-
-    job = _run(db.create_job(db_path, "Topic 1", "test-model"))
-    _run(db.set_job_status(db_path, job.id, status="completed", progress=1.0))
-
-    original_db_path = settings.db_path
-    try:
-        settings.db_path = db_path
-        client = TestClient(app)
-        response = client.get("/partials/queue_status")
-        assert response.status_code == 200
-        assert "Queue progress" in response.text
-        assert "100.0%" in response.text
-    finally:
-        settings.db_path = original_db_path
@@ -0,0 +1,14 @@
+from app import db, main
+
+
+def test_queue_stream_renders_queue_status(run, db_path_override, monkeypatch) -> None:
+    db_path = db_path_override
+    monkeypatch.setattr(main, "_queue_stream_cache", {"version": None, "html": ""})
+
+    job = run(db.create_job(db_path, "Topic 1", "test-model"))
+    run(db.set_job_status(db_path, job.id, status="completed", progress=1.0))
+
+    html = run(main._render_queue_stream(1))
+    assert "Queue progress" in html
+    assert "100.0%" in html
+
@@ -1,43 +1,28 @@
-import asyncio
-from pathlib import Path
+import os
 
-from fastapi.testclient import TestClient
+from _helpers import assert_all_in
 
-from app import db
-from app.main import app
-from app.settings import settings
 
+def test_read_book_renders_html(completed_book, client) -> None:
+    job, _ = completed_book("My Book.md")
 
-def _run(coro):
-    return asyncio.run(coro)
+    response = client.get(f"/jobs/{job.id}/read")
+    assert response.status_code == 200
+    assert_all_in(
+        response.text, ["Rendered book", "markdown-body", "<h1", "Title</h1>"]
+    )
 
 
-def test_read_book_renders_html(tmp_path: Path) -> None:
-    db_path = str(tmp_path / "test.db")
-    _run(db.init_db(db_path))
+def test_read_book_reuses_persisted_html(completed_book, client) -> None:
+    job, md_path = completed_book("Cached Book.md", "# Original\n\nHello")
 
-    job = _run(db.create_job(db_path, "Topic 1", "test-model"))
-    md_path = tmp_path / "My Book.md"
-    md_path.write_text("# Title\n\nHello", encoding="utf-8")
-    _run(
-        db.set_job_status(
-            db_path,
-            job.id,
-            status="completed",
-            progress=1.0,
-            output_path=str(md_path),
-        )
-    )
+    response = client.get(f"/jobs/{job.id}/read")
+    assert "Original</h1>" in response.text
+    html_path = md_path.with_suffix(".html")
+    assert "Original</h1>" in html_path.read_text(encoding="utf-8")
 
-    original_db_path = settings.db_path
-    try:
-        settings.db_path = db_path
-        client = TestClient(app)
-        response = client.get(f"/jobs/{job.id}/read")
-        assert response.status_code == 200
-        assert "Rendered book" in response.text
-        assert "markdown-body" in response.text
-        assert "<h1" in response.text
-        assert "Title</h1>" in response.text
-    finally:
-        settings.db_path = original_db_path
+    stat = md_path.stat()
+    md_path.write_text("# Edited\n\nHello", encoding="utf-8")
+    os.utime(md_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    response = client.get(f"/jobs/{job.id}/read")
+    assert "Edited</h1>" in response.text
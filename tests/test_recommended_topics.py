@@ -1,22 +1,90 @@
-import asyncio
-from pathlib import Path
+import pytest
+from _helpers import bulk_seed
 
 from app import db
+from app.main import _parse_recommended_topics
+from app.recommendations import _extract_json_array, recommend_topics_from_recent
 
 
-def _run(coro):
-    return asyncio.run(coro)
+def test_list_recommended_topics_orders_by_count_and_recency(
+    run, temp_db_path: str
+) -> None:
+    db_path = temp_db_path
 
+    bulk_seed(
+        db_path,
+        [
+            ("Topic A", "queued", 0.0),
+            ("Topic A", "queued", 0.0),
+            ("Topic B", "queued", 0.0),
+            ("Topic C", "queued", 0.0),
+        ],
+        model="model",
+        timestamps=[
+            "2026-02-01T00:00:00+00:00",
+            "2026-02-01T00:00:00+00:00",
+            "2026-02-02T00:00:00+00:00",
+            "2026-02-03T00:00:00+00:00",
+        ],
+    )
 
-def test_list_recommended_topics_orders_by_count_and_recency(tmp_path: Path) -> None:
-    db_path = str(tmp_path / "test.db")
-    _run(db.init_db(db_path))
+    topics = run(db.list_recommended_topics(db_path, limit=5))
 
-    _run(db.create_job(db_path, "Topic A", "model"))
-    _run(db.create_job(db_path, "Topic A", "model"))
-    _run(db.create_job(db_path, "Topic B", "model"))
+    # A wins on count; C is newer than B, so it comes first despite sorting later.
+    assert topics == ["Topic A", "Topic C", "Topic B"]
 
-    topics = _run(db.list_recommended_topics(db_path, limit=5))
 
-    assert topics[0] == "Topic A"
-    assert "Topic B" in topics
+def test_parse_recommended_topics_reuses_parsed_value() -> None:
+    entry = {
+        "key": "recommended_topics",
+        "value": '["  Topic A ", "", "Topic B"]',
+        "updated_at": "2026-02-03T12:00:00+00:00",
+    }
+
+    first = _parse_recommended_topics(entry)
+    second = _parse_recommended_topics(dict(entry))
+
+    assert first == ["Topic A", "Topic B"]
+    assert second is first
+
+    updated = dict(entry, value='["Topic C"]', updated_at="2026-02-03T12:05:00+00:00")
+    assert _parse_recommended_topics(updated) == ["Topic C"]
+
+
+def test_extract_json_array_handles_fenced_output() -> None:
+    text = 'Sure!\n```json\n["Topic A", " Topic B ", "", 3]\n```\n'
+    assert _extract_json_array(text) == ["Topic A", "Topic B"]
+
+
+def test_extract_json_array_rejects_non_array() -> None:
+    with pytest.raises(ValueError):
+        _extract_json_array('{"topics": "none"}')
+    with pytest.raises(ValueError):
+        _extract_json_array("[not json]")
+
+
+def test_recommend_topics_skips_recent_topics(monkeypatch, run) -> None:
+    calls: list[str] = []
+
+    async def _fake_generate_text(**kwargs: object) -> str:
+        calls.append(str(kwargs["prompt"]))
+        return '["Fresh Topic", "topic a", "Fresh Topic"]'
+
+    monkeypatch.setattr("app.recommendations.generate_text", _fake_generate_text)
+    recent_jobs = [
+        {"topic": "Topic A", "status": "completed", "updated_at": "2026-02-03T12:00:00"}
+    ]
+
+    topics = run(
+        recommend_topics_from_recent(
+            recent_jobs=recent_jobs,
+            limit=4,
+            ollama_base_url="http://ollama",
+            ollama_model="test-model",
+            timeout_seconds=5.0,
+        )
+    )
+
+    assert topics == ["Fresh Topic"]
+    assert len(calls) == 1
+    assert '"topic":"Topic A"' in calls[0]
@@ -0,0 +1,76 @@
+from starlette.requests import Request
+
+from app import db, main
+from app.main import _sse_event
+
+
+def test_sse_event_prefixes_each_line() -> None:
+    frame = _sse_event("queue", "<div>\n  <span>1</span>\n</div>")
+    assert frame == (
+        "event: queue\n"
+        "data: <div>\n"
+        "data:   <span>1</span>\n"
+        "data: </div>\n"
+        "\n"
+    )
+
+
+def test_job_writes_notify_change_listeners(run, temp_db_path: str) -> None:
+    db_path = temp_db_path
+
+    changed: list[str] = []
+    db.add_change_listener(changed.append)
+    try:
+        job = run(db.create_job(db_path, "Topic 1", "test-model"))
+        run(db.set_job_status(db_path, job.id, status="running", progress=0.5))
+        run(db.append_event(db_path, job.id, "info", "Working"))
+    finally:
+        db.remove_change_listener(changed.append)
+
+    assert changed == [job.id, job.id, job.id]
+
+
+def _disconnect_after_first_frame(monkeypatch) -> None:
+    # The streams loop until the client leaves; end each one after a pass.
+    states = iter([False])
+
+    async def _is_disconnected(self: Request) -> bool:
+        return next(states, True)
+
+    monkeypatch.setattr(Request, "is_disconnected", _is_disconnected)
+    monkeypatch.setattr(main, "STREAM_KEEPALIVE_SECONDS", 0.01)
+
+
+def test_queue_stream_endpoint_sends_queue_frame(
+    monkeypatch, db_path_override, client
+) -> None:
+    _disconnect_after_first_frame(monkeypatch)
+
+    response = client.get("/stream")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "event: queue\n" in response.text
+    assert "Queue progress" in response.text
+
+
+def test_job_stream_endpoint_sends_status_and_events(
+    run, monkeypatch, db_path_override, client
+) -> None:
+    job = run(db.create_job(db_path_override, "Topic 1", "test-model"))
+    run(db.append_event(db_path_override, job.id, "info", "First event"))
+    _disconnect_after_first_frame(monkeypatch)
+
+    response = client.get(f"/jobs/{job.id}/stream")
+
+    assert response.status_code == 200
+    assert "event: status\n" in response.text
+    assert "event: events\nid: " in response.text
+    assert "First event" in response.text
+    assert job.id not in main.runner._subscribers
+
+
+def test_job_stream_returns_404_for_unknown_job(db_path_override, client) -> None:
+    response = client.get("/jobs/missing/stream")
+    assert response.status_code == 404
+    assert "missing" not in main.runner._subscribers
@@ -1,80 +1,88 @@
-import asyncio
 from pathlib import Path
 
-from fastapi.testclient import TestClient
-
 from app import db
-from app.main import app
-from app.settings import settings
-
 
-def _run(coro):
-    return asyncio.run(coro)
 
+def test_tts_returns_audio(monkeypatch, completed_book, client) -> None:
+    job, _ = completed_book()
 
-def test_tts_returns_audio(tmp_path: Path, monkeypatch) -> None:
-    db_path = str(tmp_path / "test.db")
-    _run(db.init_db(db_path))
+    async def _fake_speech(
+        *, text: str, voice: str | None, speed: float, format: str = "mp3"
+    ) -> bytes:
+        return b"audio"
 
-    job = _run(db.create_job(db_path, "Topic 1", "model"))
-    md_path = tmp_path / "book.md"
-    md_path.write_text("# Title\n\nHello", encoding="utf-8")
-    _run(
-        db.set_job_status(
-            db_path,
-            job.id,
-            status="completed",
-            progress=1.0,
-            output_path=str(md_path),
-        )
+    monkeypatch.setattr("app.main.synthesize_speech", _fake_speech)
+    response = client.post(
+        f"/jobs/{job.id}/tts", data={"voice": "alloy", "speed": 1.0}
     )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("audio/mpeg")
+
+
+def test_audiobook_returns_audio(
+    tmp_path: Path, monkeypatch, completed_book, client
+) -> None:
+    job, _ = completed_book()
+    mp3_path = tmp_path / "book.mp3"
+    mp3_path.write_bytes(b"audio")
+
+    response = client.get(f"/jobs/{job.id}/audiobook?format=mp3")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("audio/mpeg")
+
 
-    original_db_path = settings.db_path
-    try:
-        settings.db_path = db_path
+def test_tts_persists_audio_per_voice_and_speed(
+    tmp_path: Path, monkeypatch, completed_book, client
+) -> None:
+    job, _ = completed_book()
 
-        async def _fake_speech(
-            *, text: str, voice: str | None, speed: float, format: str = "mp3"
-        ) -> bytes:
-            return b"audio"
+    calls: list[tuple[str | None, float]] = []
 
-        monkeypatch.setattr("app.main.synthesize_speech", _fake_speech)
-        client = TestClient(app)
+    async def _fake_speech(
+        *, text: str, voice: str | None, speed: float, format: str = "mp3"
+    ) -> bytes:
+        calls.append((voice, speed))
+        return b"audio"
+
+    monkeypatch.setattr("app.main.synthesize_speech", _fake_speech)
+    for _ in range(2):
         response = client.post(
-            f"/jobs/{job.id}/tts", data={"voice": "alloy", "speed": 1.0}
+            f"/jobs/{job.id}/tts", data={"voice": "Ana Florence", "speed": 1.25}
         )
         assert response.status_code == 200
-        assert response.headers["content-type"].startswith("audio/mpeg")
-    finally:
-        settings.db_path = original_db_path
+        assert response.content == b"audio"
 
+    assert calls == [("Ana Florence", 1.25)]
+    assert (tmp_path / "book.Ana_Florence.125.mp3").read_bytes() == b"audio"
+    assert not (tmp_path / "book.mp3").exists()
 
-def test_audiobook_returns_audio(tmp_path: Path, monkeypatch) -> None:
-    db_path = str(tmp_path / "test.db")
-    _run(db.init_db(db_path))
 
-    job = _run(db.create_job(db_path, "Topic 1", "model"))
-    md_path = tmp_path / "book.md"
-    md_path.write_text("# Title\n\nHello", encoding="utf-8")
-    mp3_path = tmp_path / "book.mp3"
-    mp3_path.write_bytes(b"audio")
-    _run(
-        db.set_job_status(
-            db_path,
-            job.id,
-            status="completed",
-            progress=1.0,
-            output_path=str(md_path),
-        )
-    )
+def test_tts_default_voice_leaves_unfinished_audiobook_alone(
+    tmp_path: Path, run, monkeypatch, db_path_override, completed_book, client
+) -> None:
+    job, _ = completed_book()
+    (tmp_path / "book.mp3").write_bytes(b"partial audiobook")
 
-    original_db_path = settings.db_path
-    try:
-        settings.db_path = db_path
+    async def _fake_speech(
+        *, text: str, voice: str | None, speed: float, format: str = "mp3"
+    ) -> bytes:
+        return b"tts"
 
-        client = TestClient(app)
-        response = client.get(f"/jobs/{job.id}/audiobook?format=mp3")
-        assert response.status_code == 200
-        assert response.headers["content-type"].startswith("audio/mpeg")
-    finally:
-        settings.db_path = original_db_path
+    monkeypatch.setattr("app.main.synthesize_speech", _fake_speech)
+    response = client.post(f"/jobs/{job.id}/tts")
+    assert response.content == b"tts"
+    assert (tmp_path / "book.mp3").read_bytes() == b"partial audiobook"
+    assert [p.name for p in tmp_path.glob("*.tmp")] == []
+
+    audiobook = run(
+        db.create_job(
+            db_path_override,
+            job.topic,
+            job.model,
+            job_type="audiobook",
+            parent_id=job.id,
+        )
+    )
+    run(db.set_job_status(db_path_override, audiobook.id, status="completed"))
+    response = client.post(f"/jobs/{job.id}/tts")
+    assert response.content == b"partial audiobook"
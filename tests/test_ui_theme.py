@@ -1,16 +1,4 @@
-import asyncio
-
-from fastapi.testclient import TestClient
-
-from app.main import app
-
-
-def _run(coro):
-    return asyncio.run(coro)
-
-
-def test_index_contains_dark_theme() -> None:
-    client = TestClient(app)
+def test_index_contains_dark_theme(db_path_override, client) -> None:
     response = client.get("/")
     assert response.status_code == 200
     assert "bg-slate-950" in response.text